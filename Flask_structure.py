@@ -1,10 +1,116 @@
-from flask import Flask   # <-- use Flask, not flash
+import hashlib
+import os
+import sys
+import time
 
-app = Flask(__name__)
+_t = time.perf_counter()
+from flask import Blueprint, Flask, Response, jsonify, request   # <-- use Flask, not flash
+FLASK_IMPORT_MS = round((time.perf_counter() - _t) * 1000, 3)
 
-@app.route("/")
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+hello_bp = Blueprint("hello", __name__)
+
+# The greeting never changes: build it and its ETag once, let clients and CDNs
+# cache it (HELLO_MAX_AGE seconds) and answer If-None-Match with 304.
+HELLO_BODY = "Hello My dear Friends".encode()
+HELLO_ETAG = hashlib.blake2b(HELLO_BODY, digest_size=16).hexdigest()
+HELLO_MAX_AGE = int(os.environ.get("HELLO_MAX_AGE", "3600"))
+
+@hello_bp.route("/")
 def hello():
-    return "Hello My dear Friends"
+    resp = Response(HELLO_BODY, mimetype="text/html")
+    resp.set_etag(HELLO_ETAG)
+    resp.cache_control.public = True
+    resp.cache_control.max_age = HELLO_MAX_AGE
+    return resp.make_conditional(request)
+
+# ---------- App factory ----------
+# create_app() mounts the hello routes and/or the math API (demo_playwright) as
+# blueprints in one service. The math module is only imported when mounted, and
+# its heavy parts (NumPy, jobs, datasets, the heavy-op process pool) are built on
+# first use, which keeps cold starts short for workers that scale to zero.
+# Startup timings are on GET /startup.
+
+def _mount_math(app, with_hello):
+    # returns the milliseconds spent importing the math module (0 when already imported)
+    if os.path.join(HERE, "demo_playwright") not in sys.path:
+        sys.path.insert(0, os.path.join(HERE, "demo_playwright"))
+    t0 = time.perf_counter()
+    import playwright_key_function as math_api
+    import_ms = (time.perf_counter() - t0) * 1000
+    app.register_blueprint(math_api.bp)
+    # "/" belongs to hello when both are mounted; the math discovery document moves to /api
+    app.add_url_rule("/api" if with_hello else "/", "math_home", math_api.home)
+    return import_ms
+
+def create_app(services=("hello", "math")):
+    t0 = time.perf_counter()
+    unknown = set(services) - {"hello", "math"}
+    if unknown:
+        raise ValueError(f"Unknown service(s): {', '.join(sorted(unknown))} (use hello, math)")
+    app = Flask(__name__)
+    if "hello" in services:
+        app.register_blueprint(hello_bp)
+    math_import_ms = _mount_math(app, "hello" in services) if "math" in services else 0.0
+
+    startup = {
+        "services": list(services),
+        "flask_import_ms": FLASK_IMPORT_MS,
+        "math_import_ms": round(math_import_ms, 3),
+        "create_app_ms": round((time.perf_counter() - t0) * 1000, 3),  # includes math_import_ms
+        "first_request_ms": None,  # create_app() return -> first request started
+    }
+    ready = time.perf_counter()
+    app.config["STARTUP"] = startup
+
+    @app.before_request
+    def _first_request():
+        if startup["first_request_ms"] is None:
+            startup["first_request_ms"] = round((time.perf_counter() - ready) * 1000, 3)
+
+    @app.get("/startup")
+    def startup_report():
+        return jsonify(startup)
+
+    return app
+
+# Hello-only app, as before (serve.py hello, flask --app Flask_structure run)
+app = create_app(("hello",))
+
+def measure_cold_start(runs=5, services=("hello", "math")):
+    """
+    Start a fresh interpreter `runs` times and time create_app() plus one request
+    through the test client; returns per-run wall times in milliseconds.
+    """
+    import subprocess
+    code = (
+        "import time; t = time.perf_counter()\n"
+        "from Flask_structure import create_app\n"
+        f"app = create_app({tuple(services)!r})\n"
+        "ready = time.perf_counter()\n"
+        "app.test_client().get('/')\n"
+        "done = time.perf_counter()\n"
+        "print((ready - t) * 1000, (done - t) * 1000, app.config['STARTUP']['create_app_ms'])\n"
+    )
+    out = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        res = subprocess.run([sys.executable, "-c", code], cwd=HERE, capture_output=True, text=True, check=True)
+        total = (time.perf_counter() - t0) * 1000
+        ready_ms, first_ms, create_ms = (float(x) for x in res.stdout.split())
+        out.append({"process_ms": round(total, 1), "ready_ms": round(ready_ms, 1),
+                    "first_response_ms": round(first_ms, 1), "create_app_ms": round(create_ms, 1)})
+    return out
 
 if __name__ == "__main__":
-    app.run(debug=True)
+    # python Flask_structure.py               -> hello + math on http://127.0.0.1:5000
+    # python Flask_structure.py --cold-start  -> cold-start timings over 5 fresh processes
+    if "--cold-start" in sys.argv:
+        for services in (("hello",), ("hello", "math")):
+            runs = measure_cold_start(5, services)
+            best = min(runs, key=lambda r: r["process_ms"])
+            print(f"{'+'.join(services):12} process={best['process_ms']} ms  ready={best['ready_ms']} ms  "
+                  f"first response={best['first_response_ms']} ms  create_app={best['create_app_ms']} ms")
+    else:
+        create_app().run(debug=True)
@@ -1,11 +1,18 @@
 import argparse
+import json
 import os
+import queue
 import re
 import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from contextlib import suppress
 from datetime import datetime
+from urllib.parse import urlsplit
 
 from selenium import webdriver
+from selenium.common.exceptions import NoSuchElementException, SessionNotCreatedException
 from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.common.by import By
@@ -13,7 +20,9 @@ from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
-HOME = "https://digianchorz.com/"
+HOME = "https://digianchorz.com/"  # pointed at the local mirror by --mirror (see site_mirror.py)
+EXTRA_CHROME_ARGS = []  # added to every browser launched by build_driver()
+BLOCK_PROFILE = "none"  # --block: resources dropped during tests (see BLOCK_PROFILES)
 
 # ---------- Utilities ----------
 
@@ -25,9 +34,20 @@ def safe_text(el):
         return (el.text or "").strip()
     return ""
 
+# While a test runs under run_test(), its output lines are collected here instead
+# of printed, so parallel tests never interleave their PASS/FAIL lines.
+_capture = threading.local()
+
+def emit(line):
+    lines = getattr(_capture, "lines", None)
+    if lines is None:
+        print(line, flush=True)
+    else:
+        lines.append(line)
+
 def log(ok, name, detail=""):
     status = "PASS" if ok else "FAIL"
-    print(f"[{status}] {name}{' — ' + detail if detail else ''}")
+    emit(f"[{status}] {name}{' — ' + detail if detail else ''}")
 
 def snap_on_fail(driver, name):
     os.makedirs("screens", exist_ok=True)
@@ -35,7 +55,36 @@ def snap_on_fail(driver, name):
     path = os.path.join("screens", f"{name}_{ts}.png")
     with suppress(Exception):
         driver.save_screenshot(path)
-        print(f"[INFO] Saved screenshot: {path}")
+        emit(f"[INFO] Saved screenshot: {path}")
+
+# All candidate selectors are tried inside the page in a single execute_script
+# call, instead of one find_elements round-trip per candidate (which adds up
+# inside wait().until polling loops).
+FIND_BATCH_JS = """
+const [selectors, root, all, attrs] = arguments;
+const scope = root || document;
+const out = [];
+for (const sel of selectors) {
+    let els;
+    try { els = scope.querySelectorAll(sel); } catch (e) { continue; }  // invalid selector: skip it
+    for (const el of els) {
+        const values = {};
+        for (const a of attrs) values[a] = el.getAttribute(a);
+        out.push({selector: sel, element: el, text: (el.innerText || '').trim(), attrs: values});
+        if (!all) return out;
+    }
+}
+return out;
+"""
+
+def find_batch(driver, selectors, root=None, all_matches=False, attrs=()):
+    """
+    Resolve CSS selectors in one round-trip. Returns a list of
+    {"selector", "element", "text", "attrs"} dicts: only the first match of the
+    first selector that matches anything, or (all_matches=True) every match of
+    every selector, in selector order. `root` limits the search to an element.
+    """
+    return driver.execute_script(FIND_BATCH_JS, list(selectors), root, all_matches, list(attrs)) or []
 
 def open_menu_if_needed(driver):
     """
@@ -123,19 +172,18 @@ def test_3_carousel_next(driver):
     driver.get(HOME)
 
     def get_active_heading():
-        # Try common carousel libs; fallbacks included
+        # Try common carousel libs; fallbacks included (one round-trip for all of them)
         selectors_css = [
             ".swiper-slide.swiper-slide-active h1, .swiper-slide.swiper-slide-active h2",
             ".slick-slide.slick-active h1, .slick-slide.slick-active h2",
             ".owl-item.active h1, .owl-item.active h2",
             "section header h1, section header h2",
+            "h1, h2",  # final fallback: first h1/h2 in the document
         ]
-        for s in selectors_css:
-            els = driver.find_elements(By.CSS_SELECTOR, s)
-            if els:
-                return els[0].text.strip()
-        # final fallback: first visible h1/h2
-        return driver.find_element(By.XPATH, "(//h1|//h2)[1]").text.strip()
+        found = find_batch(driver, selectors_css)
+        if not found:
+            raise NoSuchElementException("No h1/h2 heading on the page")
+        return found[0]["text"]
 
     try:
         before = get_active_heading()
@@ -147,16 +195,13 @@ def test_3_carousel_next(driver):
             "button:contains('Next')", "a:contains('Next')"
         ]
         clicked = False
-        for sel in next_selectors:
-            # CSS :contains isn't supported; skip those two
-            if "contains(" in sel:
-                continue
-            btns = driver.find_elements(By.CSS_SELECTOR, sel)
-            if btns:
-                driver.execute_script("arguments[0].scrollIntoView({block:'center'});", btns[0])
-                btns[0].click()
-                clicked = True
-                break
+        # CSS :contains isn't supported; skip those two
+        found = find_batch(driver, [sel for sel in next_selectors if "contains(" not in sel])
+        if found:
+            btn = found[0]["element"]
+            driver.execute_script("arguments[0].scrollIntoView({block:'center'});", btn)
+            btn.click()
+            clicked = True
         # Fallback: look for any arrow-like control
         if not clicked:
             with suppress(Exception):
@@ -206,20 +251,20 @@ def test_5_footer_contact_info(driver):
         wait(driver, 5).until(lambda d: d.execute_script("return document.readyState") == "complete")
 
         # Footer element or last main container
-        footer = None
-        candidates = driver.find_elements(By.TAG_NAME, "footer")
-        if candidates:
-            footer = candidates[0]
-        else:
-            blocks = driver.find_elements(By.CSS_SELECTOR, "footer, .site-footer, .footer, body > div:last-of-type, body > section:last-of-type")
-            footer = blocks[0] if blocks else driver.find_element(By.TAG_NAME, "body")
+        footer = find_batch(driver, [
+            "footer",
+            "footer, .site-footer, .footer, body > div:last-of-type, body > section:last-of-type",
+            "body",
+        ])[0]["element"]
 
-        # Prefer tel:/mailto:
-        tel_links = footer.find_elements(By.CSS_SELECTOR, "a[href^='tel:']")
-        mail_links = footer.find_elements(By.CSS_SELECTOR, "a[href^='mailto:']")
+        # Prefer tel:/mailto: (both link kinds, their text and href in one round-trip)
+        links = find_batch(driver, ["a[href^='tel:']", "a[href^='mailto:']"],
+                           root=footer, all_matches=True, attrs=("href",))
+        tel_links = [l for l in links if l["selector"] == "a[href^='tel:']"]
+        mail_links = [l for l in links if l["selector"] == "a[href^='mailto:']"]
 
-        tel_display = [t.text.strip() or t.get_attribute("href") for t in tel_links]
-        mail_display = [m.text.strip() or m.get_attribute("href") for m in mail_links]
+        tel_display = [l["text"] or l["attrs"]["href"] for l in tel_links]
+        mail_display = [l["text"] or l["attrs"]["href"] for l in mail_links]
 
         ok = bool(tel_links) and bool(mail_links)
 
@@ -242,9 +287,117 @@ def test_5_footer_contact_info(driver):
         log(False, "Footer shows phone & email", detail=str(e))
         snap_on_fail(driver, "footer_contact")
 
+# ---------- Driver binary cache ----------
+# ChromeDriverManager().install() resolves the driver over the network. The
+# resolved path is remembered in DRIVER_CACHE, so later runs start offline; it
+# is re-resolved only when the cached binary is gone or Chrome rejects it (e.g.
+# after a browser upgrade). CHROMEDRIVER=/path/to/chromedriver skips all of it.
+DRIVER_CACHE = os.environ.get(
+    "CHROMEDRIVER_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "demo_selenium", "chromedriver.json")
+)
+_cached_paths = set()  # paths resolve_driver_path() took from DRIVER_CACHE
+_refreshed = {}        # cached path Chrome rejected -> path resolved again (once per process)
+_refresh_lock = threading.Lock()
+
+def resolve_driver_path(refresh=False):
+    if os.environ.get("CHROMEDRIVER"):
+        return os.environ["CHROMEDRIVER"]
+    if not refresh:
+        with suppress(OSError, ValueError, KeyError, TypeError):
+            with open(DRIVER_CACHE) as f:
+                path = json.load(f)["path"]
+            if os.access(path, os.X_OK):
+                _cached_paths.add(path)
+                return path
+    path = ChromeDriverManager().install()
+    os.makedirs(os.path.dirname(DRIVER_CACHE), exist_ok=True)
+    with open(DRIVER_CACHE, "w") as f:
+        json.dump({"path": path, "resolved": datetime.now().isoformat(timespec="seconds")}, f)
+    return path
+
+# ---------- Resource blocking ----------
+# None of the tests assert on images, media, fonts or trackers, but every page
+# load waits for them. A profile is a list of CDP Network.setBlockedURLs
+# patterns (which match URLs, so resource types are expressed as extensions);
+# blocked requests fail immediately inside Chrome.
+ANALYTICS_PATTERNS = [
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*connect.facebook.net*", "*facebook.com/tr*", "*hotjar.com*", "*clarity.ms*",
+    "*linkedin.com/px*", "*snap.licdn.com*", "*bat.bing.com*",
+]
+def _extensions(*exts):
+    # "*.png" and "*.png?*": the extension must end the path, query string optional
+    return [p for ext in exts for p in (f"*.{ext}", f"*.{ext}?*")]
+
+IMAGE_PATTERNS = _extensions("png", "jpg", "jpeg", "gif", "webp", "avif", "svg", "ico")
+MEDIA_PATTERNS = _extensions("mp4", "webm", "mov", "mp3", "ogg", "wav")
+FONT_PATTERNS = _extensions("woff", "woff2", "ttf", "otf", "eot") + ["*fonts.googleapis.com*", "*fonts.gstatic.com*"]
+
+BLOCK_PROFILES = {
+    "none": [],
+    "analytics": ANALYTICS_PATTERNS,
+    "lean": ANALYTICS_PATTERNS + IMAGE_PATTERNS + MEDIA_PATTERNS + FONT_PATTERNS,
+}
+
+# per-test overrides of --block (only applied when blocking is on at all)
+TEST_BLOCK_PROFILES = {
+    "test_3_carousel_next": "analytics",  # slider libraries size slides from their images
+}
+
+def profile_for(test):
+    if BLOCK_PROFILE == "none":
+        return "none"
+    return TEST_BLOCK_PROFILES.get(test.__name__, BLOCK_PROFILE)
+
+def apply_blocking(driver, profile):
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCK_PROFILES[profile]})
+
+PAGE_STATS_JS = """
+const nav = performance.getEntriesByType('navigation')[0];
+const res = performance.getEntriesByType('resource');
+let bytes = nav ? nav.transferSize : 0;
+for (const r of res) bytes += r.transferSize || 0;
+return {bytes: bytes, requests: res.length + 1,
+        load_ms: nav && nav.loadEventEnd ? nav.loadEventEnd - nav.startTime : null};
+"""
+
+def page_stats(driver):
+    """
+    Bytes transferred, request count and load time of the current page from the
+    Resource Timing API. Cross-origin resources without Timing-Allow-Origin
+    report 0 bytes, so bytes are a lower bound.
+    """
+    return driver.execute_script(PAGE_STATS_JS)
+
+def measure_blocking(headless, driver_path, profiles, rounds=3):
+    """Load HOME with an empty cache under each profile; report bytes and time saved vs no blocking."""
+    driver = build_driver(headless=headless, driver_path=driver_path)
+    try:
+        driver.execute_cdp_cmd("Network.setCacheDisabled", {"cacheDisabled": True})
+        rows = {}
+        for profile in ["none"] + [p for p in profiles if p != "none"]:
+            apply_blocking(driver, profile)
+            runs = []
+            for _ in range(rounds):
+                driver.get("about:blank")
+                driver.get(HOME)
+                wait(driver, 30).until(lambda d: d.execute_script(
+                    "const n = performance.getEntriesByType('navigation')[0]; return n && n.loadEventEnd > 0;"))
+                runs.append(page_stats(driver))
+            runs.sort(key=lambda r: r["load_ms"])
+            rows[profile] = median = runs[len(runs) // 2]
+            base = rows["none"]
+            print(f"[BLOCK] {profile:10} {median['bytes'] / 1024:>8.0f} KB  {median['requests']:>4} requests  "
+                  f"load {median['load_ms']:>6.0f} ms  saved {(base['bytes'] - median['bytes']) / 1024:.0f} KB, "
+                  f"{base['load_ms'] - median['load_ms']:.0f} ms per page load")
+        return rows
+    finally:
+        driver.quit()
+
 # ---------- Runner ----------
 
-def build_driver(headless=False):
+def build_driver(headless=False, driver_path=None):
     options = webdriver.ChromeOptions()
     # Make runs quiet:
     options.add_argument("--log-level=3")  # 0=INFO,1=WARNING,2=ERROR,3=FATAL
@@ -257,24 +410,272 @@ def build_driver(headless=False):
     options.add_experimental_option("useAutomationExtension", False)
     if headless:
         options.add_argument("--headless=new")
+    for arg in EXTRA_CHROME_ARGS:
+        options.add_argument(arg)
+
+    path = driver_path or resolve_driver_path()
+    path = _refreshed.get(path, path)
+    try:
+        return webdriver.Chrome(service=Service(path, log_path="chromedriver.log"), options=options)
+    except SessionNotCreatedException:
+        if path not in _cached_paths:
+            raise
+        # cached driver no longer matches the installed Chrome: resolve again (needs network
+        # once); the pool's other browsers, launched with the same stale path, reuse the result
+        with _refresh_lock:
+            if path not in _refreshed:
+                _refreshed[path] = resolve_driver_path(refresh=True)
+        return webdriver.Chrome(service=Service(_refreshed[path], log_path="chromedriver.log"), options=options)
+
+def reset_driver(driver):
+    """Return a session to a clean state: one tab, no cookies or site storage, about:blank."""
+    handles = driver.window_handles
+    for handle in handles[1:]:
+        driver.switch_to.window(handle)
+        driver.close()
+    driver.switch_to.window(handles[0])
+    with suppress(Exception):  # storage of the page currently open (not reachable on some error pages)
+        driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+    driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+    origin = "{0.scheme}://{0.netloc}".format(urlsplit(HOME))
+    driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+    # the HTTP cache is kept on purpose: it is not test state and makes the next load faster
+    driver.get("about:blank")
+
+class DriverPool:
+    """
+    Browser sessions launched up front and reset between tests instead of
+    relaunched. acquire() waits for a free session and hands it out clean,
+    with the seconds the reset took; a session that fails to reset is replaced
+    by a fresh one.
+    """
 
-    service = Service(ChromeDriverManager().install(), log_path="chromedriver.log")
-    return webdriver.Chrome(service=service, options=options)
+    def __init__(self, size, headless=False, driver_path=None):
+        self.headless = headless
+        self.driver_path = driver_path
+        self._idle = queue.Queue()
+        self._drivers = []
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(size) as ex:
+            # launch the browsers concurrently; launching is a large share of a short run
+            for driver in ex.map(lambda _: self._launch(), range(size)):
+                self._idle.put(driver)
+        self.launch_time = time.perf_counter() - t0
+
+    def _launch(self):
+        driver = build_driver(headless=self.headless, driver_path=self.driver_path)
+        self._drivers.append(driver)
+        return driver
+
+    def acquire(self):
+        driver = self._idle.get()
+        t0 = time.perf_counter()
+        try:
+            reset_driver(driver)
+        except Exception:
+            with suppress(Exception):
+                driver.quit()
+            self._drivers.remove(driver)
+            driver = self._launch()
+        return driver, time.perf_counter() - t0
+
+    def release(self, driver):
+        self._idle.put(driver)
+
+    def run(self, test):
+        driver, setup = self.acquire()
+        try:
+            profile = profile_for(test)
+            apply_blocking(driver, profile)
+            name, lines, seconds = run_test(test, driver)
+            with suppress(Exception):
+                stats = page_stats(driver)
+                lines.append(f"[INFO] last page: {stats['bytes'] / 1024:.0f} KB, {stats['requests']} requests, "
+                             f"load {stats['load_ms'] or 0:.0f} ms (block profile: {profile})")
+            return name, lines, seconds, setup
+        finally:
+            self.release(driver)
+
+    def close(self):
+        for driver in self._drivers:
+            with suppress(Exception):
+                driver.quit()
+        self._drivers = []
+
+TESTS = [
+    test_1_about_nav,
+    test_2_services_seo_page,
+    test_3_carousel_next,
+    test_4_contact_form,
+    test_5_footer_contact_info,
+]
+
+def run_test(test, driver):
+    """Run one test with its output captured; returns (name, lines, seconds)."""
+    _capture.lines = []
+    t0 = time.perf_counter()
+    try:
+        test(driver)
+    except Exception as e:  # tests report their own failures; this only guards the runner
+        log(False, test.__name__, detail=str(e))
+    finally:
+        lines, _capture.lines = _capture.lines, None
+    return test.__name__, lines, time.perf_counter() - t0
+
+def print_result(result):
+    name, lines, seconds, setup = result
+    print(f"--- {name} ({seconds:.1f}s, setup {setup * 1000:.0f} ms)")
+    print("\n".join(lines), flush=True)  # one write per test: blocks never interleave
+
+def run_serial(tests, headless, driver_path):
+    pool = DriverPool(1, headless, driver_path)
+    try:
+        results = []
+        for test in tests:
+            results.append(pool.run(test))
+            print_result(results[-1])
+        return results
+    finally:
+        pool.close()
+
+# Process mode: each worker process owns a one-session pool for its lifetime
+_proc_pool = None
+
+def _init_process(headless, driver_path, home, extra_args, block):
+    global _proc_pool, HOME, BLOCK_PROFILE
+    from multiprocessing import util
+    HOME = home  # main() may have pointed it at the mirror; not inherited without fork
+    BLOCK_PROFILE = block
+    EXTRA_CHROME_ARGS[:] = extra_args
+    _proc_pool = DriverPool(1, headless, driver_path)
+    util.Finalize(_proc_pool, _proc_pool.close, exitpriority=10)  # atexit does not run in pool workers
+
+def _run_in_process(test_name):
+    return _proc_pool.run(globals()[test_name])
+
+def run_parallel(tests, workers, headless, driver_path, mode="threads"):
+    """Distribute tests over `workers` browsers; results are printed as each test finishes."""
+    results = []
+    if mode == "processes":
+        with ProcessPoolExecutor(workers, initializer=_init_process,
+                                 initargs=(headless, driver_path, HOME, EXTRA_CHROME_ARGS, BLOCK_PROFILE)) as ex:
+            for fut in as_completed([ex.submit(_run_in_process, t.__name__) for t in tests]):
+                results.append(fut.result())
+                print_result(results[-1])
+        return results
+
+    pool = DriverPool(workers, headless, driver_path)
+    try:
+        with ThreadPoolExecutor(workers) as ex:
+            for fut in as_completed([ex.submit(pool.run, t) for t in tests]):
+                results.append(fut.result())
+                print_result(results[-1])
+    finally:
+        pool.close()
+    return results
+
+def summarize(label, results, wall):
+    failed = sum(1 for _, lines, _, _ in results if any(l.startswith("[FAIL]") for l in lines))
+    screens = [l.split(": ", 1)[1] for _, lines, _, _ in results for l in lines if l.startswith("[INFO] Saved screenshot")]
+    busy = sum(seconds for _, _, seconds, _ in results)
+    setup = sum(s for _, _, _, s in results) / len(results) if results else 0.0
+    print(f"[SUMMARY] {label}: {len(results) - failed}/{len(results)} passed in {wall:.1f}s "
+          f"(test time {busy:.1f}s, setup {setup * 1000:.0f} ms/test)")
+    for path in screens:
+        print(f"[SUMMARY] screenshot: {path}")
+    return failed
+
+def measure_setup(headless, driver_path, rounds=5):
+    """Per-test setup cost: launching a fresh browser vs resetting a warm pooled session."""
+    cold = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        driver = build_driver(headless=headless, driver_path=driver_path)
+        cold.append(time.perf_counter() - t0)
+        driver.quit()
+    warm = []
+    pool = DriverPool(1, headless, driver_path)
+    try:
+        for _ in range(rounds):
+            driver, setup = pool.acquire()
+            warm.append(setup)
+            driver.get(HOME)  # leave some state behind for the next reset to clear
+            pool.release(driver)
+    finally:
+        pool.close()
+    cold_ms, warm_ms = sum(cold) / len(cold) * 1000, sum(warm) / len(warm) * 1000
+    print(f"[SETUP] fresh browser: {cold_ms:.0f} ms/test, warm pool reset: {warm_ms:.0f} ms/test "
+          f"({cold_ms / warm_ms:.1f}x faster)")
 
 def main():
+    global HOME, BLOCK_PROFILE
     parser = argparse.ArgumentParser(description="Selenium tests for digianchorz.com")
     parser.add_argument("--headless", action="store_true", help="Run Chrome headless")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Browsers to run tests on in parallel (>1 implies --headless)")
+    parser.add_argument("--mode", choices=["threads", "processes"], default="threads",
+                        help="Parallel runner: one thread or one process per browser")
+    parser.add_argument("--compare-serial", action="store_true",
+                        help="Also run the suite serially on one browser and report the speedup")
+    parser.add_argument("--measure-setup", action="store_true",
+                        help="Compare per-test setup time of fresh browsers vs the warm pool, then exit")
+    parser.add_argument("--mirror", choices=["record", "replay"],
+                        help="record: capture the pages the tests touch into --archive; "
+                             "replay: run against that local copy with no network")
+    parser.add_argument("--archive", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "site_archive"),
+                        help="Directory of the recorded site (default: Selenium/site_archive)")
+    parser.add_argument("--block", choices=sorted(BLOCK_PROFILES), default="none",
+                        help="Resources to drop during tests (lean: images, media, fonts, analytics)")
+    parser.add_argument("--measure-blocking", action="store_true",
+                        help="Report bytes and load time saved on HOME by each block profile, then exit")
     args = parser.parse_args()
-
-    driver = build_driver(headless=args.headless)
+    BLOCK_PROFILE = args.block
+
+    # resolved once (offline after the first run), shared by every browser in the pool
+    driver_path = resolve_driver_path()
+    workers = max(1, min(args.workers, len(TESTS)))
+
+    mirror = None
+    if args.mirror:
+        from site_mirror import SiteMirror
+        mirror = SiteMirror(HOME, args.archive, mode=args.mirror)
+        HOME = mirror.start()
+        if args.mirror == "replay":
+            # every other host (fonts, CDNs, analytics) fails fast instead of reaching the network
+            EXTRA_CHROME_ARGS.append("--host-resolver-rules=MAP * ~NOTFOUND, EXCLUDE 127.0.0.1")
+        print(f"[INFO] {args.mirror} mirror of {mirror.origin} at {HOME} (archive: {args.archive})")
     try:
-        test_1_about_nav(driver)
-        test_2_services_seo_page(driver)
-        test_3_carousel_next(driver)
-        test_4_contact_form(driver)
-        test_5_footer_contact_info(driver)
+        return run_suites(args, workers, driver_path)
     finally:
-        driver.quit()
+        if mirror is not None:
+            mirror.stop()
+            print(f"[INFO] mirror: {mirror.stats()}")
+
+def run_suites(args, workers, driver_path):
+    if args.measure_setup:
+        measure_setup(args.headless, driver_path)
+        return 0
+    if args.measure_blocking:
+        measure_blocking(args.headless, driver_path, sorted(BLOCK_PROFILES))
+        return 0
+
+    # parallel runs are always headless; the serial baseline runs the same way so
+    # the speedup compares like with like
+    headless = args.headless or workers > 1
+    serial_wall = None
+    if workers == 1 or args.compare_serial:
+        t0 = time.perf_counter()
+        results = run_serial(TESTS, headless, driver_path)
+        serial_wall = time.perf_counter() - t0
+        failed = summarize("serial", results, serial_wall)
+    if workers > 1:
+        t0 = time.perf_counter()
+        results = run_parallel(TESTS, workers, headless, driver_path, args.mode)
+        wall = time.perf_counter() - t0
+        failed = summarize(f"parallel ({workers} {args.mode})", results, wall)
+        if serial_wall is not None:
+            print(f"[SUMMARY] speedup vs serial: {serial_wall / wall:.2f}x")
+    return 1 if failed else 0
 
 if __name__ == "__main__":
     sys.exit(main() or 0)
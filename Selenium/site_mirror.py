@@ -0,0 +1,160 @@
+# site_mirror.py
+# Record/replay mirror of the site under test, served from 127.0.0.1.
+#
+#   record: every request is fetched from the live origin, stored in the
+#           archive directory and served; run the suite once in this mode
+#   replay: requests are answered from the archive only (unknown URLs -> 404),
+#           so suite runs need no network and pages load in milliseconds
+#
+# Links to the origin inside HTML/CSS/JS/JSON (and redirect Locations) are
+# rewritten to the local address when served, so navigation stays on the
+# mirror. Third-party hosts (fonts, CDNs, analytics) are not mirrored; in replay
+# mode demo_selenium.py resolves them to nothing so they fail fast offline.
+import hashlib
+import json
+import os
+import threading
+import urllib.error
+import urllib.request
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+REWRITE_TYPES = ("text/html", "text/css", "text/javascript", "application/javascript",
+                 "application/json", "application/xml", "text/xml", "image/svg+xml")
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    # record redirects as they are instead of following them
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+class SiteMirror:
+    def __init__(self, origin, archive_dir, mode="replay", port=0):
+        if mode not in ("record", "replay"):
+            raise ValueError("mode must be 'record' or 'replay'")
+        url = urlsplit(origin)
+        self.origin = f"{url.scheme}://{url.netloc}"
+        self.host = url.netloc
+        self.archive_dir = archive_dir
+        self.mode = mode
+        self._index_path = os.path.join(archive_dir, "index.json")
+        self._lock = threading.Lock()
+        self._opener = urllib.request.build_opener(_NoRedirect)
+        self.hits = self.misses = self.recorded = 0
+        self.index = {}
+        if os.path.exists(self._index_path):
+            with open(self._index_path) as f:
+                self.index = json.load(f)
+        elif mode == "replay":
+            raise FileNotFoundError(f"No recorded archive at {archive_dir} (run once with record mode)")
+        os.makedirs(archive_dir, exist_ok=True)
+
+        mirror = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                mirror._serve(self, head=False)
+
+            def do_HEAD(self):
+                mirror._serve(self, head=True)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self._server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        self._thread = None
+
+    # ---------- Archive ----------
+
+    def _body_path(self, key):
+        return os.path.join(self.archive_dir, hashlib.sha1(key.encode()).hexdigest() + ".body")
+
+    def _record(self, key, user_agent):
+        req = urllib.request.Request(self.origin + key, headers={
+            "User-Agent": user_agent or "Mozilla/5.0",
+            "Accept-Encoding": "identity",  # store plain bodies so they can be rewritten
+        })
+        try:
+            resp = self._opener.open(req, timeout=30)
+            status, headers, body = resp.status, resp.headers, resp.read()
+        except urllib.error.HTTPError as e:  # 3xx (not followed) and 4xx/5xx are recorded too
+            status, headers, body = e.code, e.headers, e.read()
+        entry = {
+            "status": status,
+            "content_type": headers.get("Content-Type", "application/octet-stream"),
+            "location": headers.get("Location"),
+            "recorded": datetime.now().isoformat(timespec="seconds"),
+        }
+        with open(self._body_path(key), "wb") as f:
+            f.write(body)
+        with self._lock:
+            self.index[key] = entry
+            self.recorded += 1
+        return entry, body
+
+    def save(self):
+        with self._lock:
+            tmp = self._index_path + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump(self.index, f, indent=1, sort_keys=True)
+            os.replace(tmp, self._index_path)
+
+    # ---------- Serving ----------
+
+    def _rewrite(self, data):
+        local = self.url.encode()
+        local_host = local.split(b"//", 1)[1]
+        for host in (b"www." + self.host.encode(), self.host.encode()):
+            for scheme in (b"https:", b"http:"):
+                data = data.replace(scheme + b"//" + host, local)
+                data = data.replace(scheme + b"\\/\\/" + host, local.replace(b"/", b"\\/"))  # JSON-escaped
+            data = data.replace(b"//" + host, b"//" + local_host)  # protocol-relative
+        return data
+
+    def _serve(self, handler, head):
+        key = handler.path
+        entry = self.index.get(key)
+        if self.mode == "record":
+            try:
+                entry, body = self._record(key, handler.headers.get("User-Agent"))
+            except (OSError, ValueError) as e:
+                handler.send_error(502, f"Recording {key} failed: {e}")
+                return
+        elif entry is None:
+            self.misses += 1
+            handler.send_error(404, "Not in the recorded archive")
+            return
+        else:
+            self.hits += 1
+            with open(self._body_path(key), "rb") as f:
+                body = f.read()
+
+        ctype = entry["content_type"]
+        if ctype.split(";")[0].strip() in REWRITE_TYPES:
+            body = self._rewrite(body)
+        handler.send_response(entry["status"])
+        handler.send_header("Content-Type", ctype)
+        handler.send_header("Content-Length", str(len(body)))
+        handler.send_header("Cache-Control", "max-age=300")
+        if entry.get("location"):
+            handler.send_header("Location", self._rewrite(entry["location"].encode()).decode())
+        handler.end_headers()
+        if not head:
+            handler.wfile.write(body)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="site-mirror", daemon=True)
+        self._thread.start()
+        return self.url + "/"
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self.mode == "record":
+            self.save()
+
+    def stats(self):
+        return {"mode": self.mode, "entries": len(self.index), "recorded": self.recorded,
+                "hits": self.hits, "misses": self.misses}
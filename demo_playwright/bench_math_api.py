@@ -0,0 +1,418 @@
+# bench_math_api.py
+# Loopback benchmarks for the math API. Servers are started as subprocesses and
+# driven by an asyncio keep-alive HTTP/1.1 client, so no extra load-testing tool
+# is needed.
+#
+#   load:    mixed query-string / path / JSON-body traffic from several load
+#            processes; per-route throughput, p50/p95/p99 and error rate go to a
+#            JSON file that can be diffed between commits
+#   compare: Flask (WSGI, threaded dev server) vs the ASGI build
+#   cache:   per-process ResultCache vs the shared-memory SharedResultCache,
+#            hit rate and lookup latency across forked worker processes
+#
+# Run: python bench_math_api.py load --processes 4 --concurrency 64 --out bench.json
+#      python bench_math_api.py compare --duration 5 --concurrency 1 64 512
+#      python bench_math_api.py cache --workers 8 --keys 20000
+#      (the ASGI server needs: pip install uvicorn)
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+HOST = "127.0.0.1"
+
+DEFAULT_PATHS = [
+    "/calc?op=add&a=5&b=10",
+    "/math/multiply?a=3&b=4",
+    "/math/divide/10/4",
+]
+
+SERVERS = {
+    "flask": [sys.executable, "-c",
+              "import sys; import playwright_key_function as m; "
+              "m.app.run(host=sys.argv[1], port=int(sys.argv[2]), threaded=True)"],
+    "asgi": [sys.executable, "-m", "uvicorn", "math_api_asgi:app",
+             "--log-level", "warning", "--no-access-log", "--host"],
+}
+
+# ---------- Server processes ----------
+
+def free_port():
+    with socket.socket() as s:
+        s.bind((HOST, 0))
+        return s.getsockname()[1]
+
+def wait_for_port(port, timeout=15.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with socket.socket() as s:
+            if s.connect_ex((HOST, port)) == 0:
+                return True
+        time.sleep(0.1)
+    return False
+
+def start_server(kind, port):
+    if kind == "flask":
+        cmd = SERVERS["flask"] + [HOST, str(port)]
+    else:
+        cmd = SERVERS["asgi"] + [HOST, "--port", str(port)]
+    proc = subprocess.Popen(cmd, cwd=HERE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    if not wait_for_port(port):
+        proc.kill()
+        raise RuntimeError(f"{kind} server did not start on port {port}")
+    return proc
+
+def stop_server(proc):
+    proc.terminate()
+    try:
+        proc.wait(timeout=5)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+
+# ---------- HTTP/1.1 keep-alive client ----------
+
+def build_request(method, path, body=None):
+    head = f"{method} {path} HTTP/1.1\r\nHost: {HOST}\r\n"
+    if body is not None:
+        payload = json.dumps(body).encode()
+        head += f"Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n"
+        return head.encode() + b"\r\n" + payload
+    return head.encode() + b"\r\n"
+
+async def read_response(reader):
+    """Returns (status, must_close). The body is read and discarded."""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("connection closed")
+    status = int(status_line.split()[1])
+    length, close = None, status_line.startswith(b"HTTP/1.0")
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        name, value = name.strip().lower(), value.strip().lower()
+        if name == "content-length":
+            length = int(value)
+        elif name == "connection":
+            close = value == "close"
+    if length is None:
+        await reader.read()
+        close = True
+    else:
+        await reader.readexactly(length)
+    return status, close
+
+async def _connection(port, requests, offset, stop_at, results):
+    reader = writer = None
+    i = offset
+    while time.perf_counter() < stop_at:
+        if writer is None:
+            try:
+                reader, writer = await asyncio.open_connection(HOST, port)
+            except OSError:
+                results["connect"]["errors"] += 1
+                await asyncio.sleep(0.01)
+                continue
+        label, raw = requests[i % len(requests)]
+        i += 1
+        row = results[label]
+        t0 = time.perf_counter()
+        try:
+            writer.write(raw)
+            status, close = await read_response(reader)
+        except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError, IndexError):
+            row["errors"] += 1
+            writer.close()
+            writer = None
+            continue
+        row["latencies"].append(time.perf_counter() - t0)
+        if status >= 400:
+            row["errors"] += 1
+        if close:
+            writer.close()
+            writer = None
+    if writer is not None:
+        writer.close()
+
+async def drive(port, requests, concurrency, duration):
+    """
+    Open `concurrency` connections and loop over `requests` ((label, raw bytes)
+    pairs) until `duration` seconds pass. Returns ({label: {latencies, errors}}, elapsed).
+    """
+    labels = {label for label, _ in requests} | {"connect"}
+    results = {label: {"latencies": [], "errors": 0} for label in labels}
+    start = time.perf_counter()
+    stop_at = start + duration
+    await asyncio.gather(*(
+        _connection(port, requests, n, stop_at, results) for n in range(concurrency)
+    ))
+    return results, time.perf_counter() - start
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, int(round(q / 100 * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+def summarize(latencies, errors, elapsed):
+    lat = sorted(latencies)
+    attempts = len(lat) + errors
+    return {
+        "requests": len(lat),
+        "errors": errors,
+        "error_rate": round(errors / attempts, 4) if attempts else 0.0,
+        "rps": round(len(lat) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(lat, 50) * 1000, 3),
+        "p95_ms": round(percentile(lat, 95) * 1000, 3),
+        "p99_ms": round(percentile(lat, 99) * 1000, 3),
+    }
+
+def merge(parts):
+    """Merge drive() results from several runs/processes into {label: (latencies, errors)}."""
+    merged = {}
+    for results in parts:
+        for label, row in results.items():
+            lat, errors = merged.setdefault(label, ([], [0]))
+            lat.extend(row["latencies"])
+            errors[0] += row["errors"]
+    return {label: (lat, errors[0]) for label, (lat, errors) in merged.items()}
+
+# ---------- Mixed load ----------
+
+STYLES = ("query", "path_query", "path", "json")
+OPS = ("add", "subtract", "multiply", "divide")
+
+def build_mix(weights, size=1000, seed=1234):
+    """Pre-built (style, raw request) pairs; divisors are never zero so every request should succeed."""
+    rng = random.Random(seed)
+    styles = [s for s in STYLES for _ in range(weights.get(s, 0))]
+    if not styles:
+        raise ValueError("Mix needs at least one style with a positive weight")
+    mix = []
+    for _ in range(size):
+        style = rng.choice(styles)
+        op = rng.choice(OPS)
+        a = rng.randint(-1000, 1000)
+        b = rng.randint(1, 1000) * rng.choice((-1, 1))
+        if style == "query":
+            raw = build_request("GET", f"/{rng.choice(('calc', 'math'))}?op={op}&a={a}&b={b}")
+        elif style == "path_query":
+            raw = build_request("GET", f"/math/{op}?a={a}&b={b}")
+        elif style == "path":
+            raw = build_request("GET", f"/math/{op}/{a}/{b}")
+        else:
+            raw = build_request("POST", "/math", {"op": op, "a": a, "b": b})
+        mix.append((style, raw))
+    return mix
+
+def parse_mix(text):
+    # "query=2,path=1,json=1" -> {"query": 2, "path": 1, "json": 1}
+    weights = {}
+    for part in filter(None, text.split(",")):
+        name, _, weight = part.partition("=")
+        if name not in STYLES:
+            raise argparse.ArgumentTypeError(f"Unknown style '{name}' (use {', '.join(STYLES)})")
+        weights[name] = int(weight or 1)
+    return weights
+
+def _load_worker(job):
+    port, mix, concurrency, duration, seed = job
+    random.Random(seed).shuffle(mix)
+    return asyncio.run(drive(port, mix, concurrency, duration))
+
+def git_revision():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE,
+                             capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def run_load(port, weights, processes, concurrency, duration, warmup):
+    mix = build_mix(weights)
+    if warmup > 0:
+        asyncio.run(drive(port, mix, 4, warmup))
+    # split connections over processes so the client is not the bottleneck
+    per_proc = [concurrency // processes + (1 if n < concurrency % processes else 0) for n in range(processes)]
+    jobs = [(port, list(mix), c, duration, n) for n, c in enumerate(per_proc) if c > 0]
+    with multiprocessing.Pool(len(jobs)) as pool:
+        parts = pool.map(_load_worker, jobs)
+    elapsed = max(e for _, e in parts)
+    merged = merge(r for r, _ in parts)
+
+    routes = {label: summarize(lat, errors, elapsed) for label, (lat, errors) in merged.items()
+              if lat or errors}
+    all_lat = [x for label, (lat, _) in merged.items() for x in lat]
+    all_errors = sum(errors for _, errors in merged.values())
+    return {
+        "meta": {
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "processes": len(jobs),
+            "concurrency": concurrency,
+            "duration_s": duration,
+            "mix": weights,
+        },
+        "routes": routes,
+        "total": summarize(all_lat, all_errors, elapsed),
+    }
+
+def print_table(report):
+    print(f"{'route':12} {'rps':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'err %':>7}")
+    rows = sorted(report["routes"].items()) + [("TOTAL", report["total"])]
+    for label, row in rows:
+        print(f"{label:12} {row['rps']:>9} {row['p50_ms']:>8} {row['p95_ms']:>8} "
+              f"{row['p99_ms']:>8} {row['error_rate'] * 100:>6.2f}%")
+
+# ---------- Flask vs ASGI ----------
+
+def compare(kinds, levels, duration, warmup):
+    requests = [("GET", build_request("GET", p)) for p in DEFAULT_PATHS]
+    results = {}
+    for kind in kinds:
+        port = free_port()
+        try:
+            proc = start_server(kind, port)
+        except (RuntimeError, OSError) as e:
+            print(f"[SKIP] {kind}: {e}")
+            continue
+        try:
+            asyncio.run(drive(port, requests, 4, warmup))
+            for c in levels:
+                run, elapsed = asyncio.run(drive(port, requests, c, duration))
+                lat, errors = merge([run])["GET"]
+                results[f"{kind}@{c}"] = row = summarize(lat, errors + run["connect"]["errors"], elapsed)
+                print(f"{kind:6} c={c:<4} rps={row['rps']:>9}  p99={row['p99_ms']:>8} ms  errors={row['errors']}")
+        finally:
+            stop_server(proc)
+    return results
+
+# ---------- Per-process vs shared result cache ----------
+
+_bench_cache = None  # set before forking so every worker inherits the same object
+
+def _cache_stream(keys, requests, seed):
+    # Zipf-like popularity (a few hot tuples, a long tail), like real GET traffic
+    rng = random.Random(seed)
+    weights = [1.0 / (rank + 1) for rank in range(keys)]
+    ranks = rng.choices(range(keys), weights=weights, k=requests)
+    return [("add", float(r), float(r % 97)) for r in ranks]
+
+def _cache_worker(job):
+    from playwright_key_function import compute
+    keys, requests, seed = job
+    cache = _bench_cache
+    lookups = []
+    started = time.perf_counter()
+    for key in _cache_stream(keys, requests, seed):
+        t0 = time.perf_counter()
+        hit = cache.get(key)
+        lookups.append(time.perf_counter() - t0)
+        if hit is None:
+            op, a, b = key
+            cache.put(key, (json.dumps({"op": op, "a": a, "b": b, "result": compute(op, a, b)}).encode(), 200))
+    return lookups, time.perf_counter() - started, cache.hits, cache.misses
+
+def cache_bench(workers, keys, requests, capacity):
+    global _bench_cache
+    from math_cache import ResultCache
+    from math_shm_cache import SharedResultCache
+
+    ctx = multiprocessing.get_context("fork")
+    results = {}
+    # same memory budget: N private caches of `capacity` entries vs one table of N * capacity slots
+    for name, make in (("per_process", lambda: ResultCache(capacity, ttl=0)),
+                       ("shared", lambda: SharedResultCache(capacity * workers, ttl=0))):
+        _bench_cache = make()
+        with ctx.Pool(workers) as pool:
+            parts = pool.map(_cache_worker, [(keys, requests, n) for n in range(workers)])
+        lookups = sorted(x for lat, _, _, _ in parts for x in lat)
+        hits = sum(h for _, _, h, _ in parts)
+        total = hits + sum(m for _, _, _, m in parts)
+        results[name] = row = {
+            "workers": workers,
+            "lookups": total,
+            "hit_rate": round(hits / total, 4) if total else 0.0,
+            "lookup_p50_us": round(percentile(lookups, 50) * 1e6, 2),
+            "lookup_p99_us": round(percentile(lookups, 99) * 1e6, 2),
+            "requests_per_s": round(total / max(e for _, e, _, _ in parts), 1),
+        }
+        print(f"{name:12} hit={row['hit_rate'] * 100:>6.2f}%  lookup p50={row['lookup_p50_us']:>7} us  "
+              f"p99={row['lookup_p99_us']:>7} us  {row['requests_per_s']:>10} req/s")
+    _bench_cache = None
+    return results
+
+def save(results, path):
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write("\n")
+    print(f"[INFO] Saved results: {path}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Loopback benchmarks for the math API")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    load = sub.add_parser("load", help="Mixed-style load with per-route latency report")
+    load.add_argument("--server", default="flask", choices=sorted(SERVERS))
+    load.add_argument("--port", type=int, help="Use a server already listening on this loopback port")
+    load.add_argument("--mix", type=parse_mix, default=parse_mix("query=1,path_query=1,path=1,json=1"),
+                      help="Style weights, e.g. query=2,path=1,json=1")
+    load.add_argument("--processes", type=int, default=max(1, min(4, os.cpu_count() or 1)))
+    load.add_argument("--concurrency", type=int, default=32, help="Total connections across processes")
+    load.add_argument("--duration", type=float, default=10.0)
+    load.add_argument("--warmup", type=float, default=1.0)
+    load.add_argument("--out", default="bench_math_api.json", help="JSON report path")
+
+    cmp_ = sub.add_parser("compare", help="Flask vs ASGI at several concurrency levels")
+    cmp_.add_argument("--servers", nargs="+", default=["flask", "asgi"], choices=sorted(SERVERS))
+    cmp_.add_argument("--concurrency", nargs="+", type=int, default=[1, 64, 512])
+    cmp_.add_argument("--duration", type=float, default=5.0, help="Seconds per concurrency level")
+    cmp_.add_argument("--warmup", type=float, default=1.0)
+    cmp_.add_argument("--out", help="Write results as JSON to this file")
+
+    cache = sub.add_parser("cache", help="Per-process vs shared-memory result cache across workers")
+    cache.add_argument("--workers", type=int, default=8)
+    cache.add_argument("--keys", type=int, default=20000, help="Distinct (op, a, b) tuples")
+    cache.add_argument("--requests", type=int, default=50000, help="Lookups per worker")
+    cache.add_argument("--capacity", type=int, default=2048, help="Entries per worker's cache budget")
+    cache.add_argument("--out", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    if args.command == "cache":
+        results = cache_bench(max(1, args.workers), args.keys, args.requests, args.capacity)
+        if args.out:
+            save(results, args.out)
+        return 0
+
+    if args.command == "compare":
+        results = compare(args.servers, args.concurrency, args.duration, args.warmup)
+        if args.out:
+            save(results, args.out)
+        return 0
+
+    proc = None
+    port = args.port
+    if port is None:
+        port = free_port()
+        proc = start_server(args.server, port)
+    try:
+        report = run_load(port, args.mix, max(1, args.processes), args.concurrency, args.duration, args.warmup)
+    finally:
+        if proc is not None:
+            stop_server(proc)
+    report["meta"]["server"] = args.server if proc is not None else f"127.0.0.1:{port}"
+    print_table(report)
+    save(report, args.out)
+    return 1 if report["total"]["errors"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main() or 0)
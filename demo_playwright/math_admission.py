@@ -0,0 +1,95 @@
+# math_admission.py
+# Admission control for the math API: a token-bucket rate limiter plus a
+# concurrency limiter with a bounded wait queue. Requests that cannot get in
+# are shed right away (429 for rate, 503 for a full or slow queue) with a
+# Retry-After hint instead of piling up behind a saturated worker.
+import math
+import threading
+import time
+
+class TokenBucket:
+    """`rate` tokens per second, holding at most `burst` tokens."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self._tokens = self.burst
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self):
+        """Returns (ok, seconds until a token is available)."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+            self._stamp = now
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return True, 0.0
+            return False, (1.0 - self._tokens) / self.rate
+
+class AdmissionController:
+    """
+    max_inflight: requests executing at once (0 = unlimited)
+    max_queue:    requests allowed to wait for a slot; the rest are shed
+    queue_timeout: seconds a queued request waits before it is shed
+    rate/burst:   token bucket in front of everything (rate 0 = off)
+    """
+
+    def __init__(self, max_inflight=0, max_queue=64, queue_timeout=1.0, rate=0.0, burst=0.0):
+        self.max_inflight = max_inflight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.bucket = TokenBucket(rate, burst or rate) if rate > 0 else None
+        self._cond = threading.Condition()
+        self.inflight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.shed = {"rate": 0, "queue_full": 0, "queue_timeout": 0}
+
+    def acquire(self):
+        """
+        Returns (None, 0) when admitted (call release() afterwards), otherwise
+        (status, retry_after_seconds) for the rejection.
+        """
+        if self.bucket is not None:
+            ok, wait_s = self.bucket.take()
+            if not ok:
+                with self._cond:
+                    self.shed["rate"] += 1
+                return 429, max(1, math.ceil(wait_s))
+        with self._cond:
+            if self.max_inflight and self.inflight >= self.max_inflight:
+                if self.waiting >= self.max_queue:
+                    self.shed["queue_full"] += 1
+                    return 503, max(1, math.ceil(self.queue_timeout))
+                self.waiting += 1
+                try:
+                    got = self._cond.wait_for(lambda: self.inflight < self.max_inflight, self.queue_timeout)
+                finally:
+                    self.waiting -= 1
+                if not got:
+                    self.shed["queue_timeout"] += 1
+                    return 503, max(1, math.ceil(self.queue_timeout))
+            self.inflight += 1
+            self.admitted += 1
+            return None, 0
+
+    def release(self):
+        with self._cond:
+            self.inflight -= 1
+            self._cond.notify()
+
+    def stats(self):
+        with self._cond:
+            return {
+                "max_inflight": self.max_inflight,
+                "max_queue": self.max_queue,
+                "queue_timeout": self.queue_timeout,
+                "rate": self.bucket.rate if self.bucket else 0.0,
+                "burst": self.bucket.burst if self.bucket else 0.0,
+                "inflight": self.inflight,
+                "queue_depth": self.waiting,
+                "admitted": self.admitted,
+                "shed": dict(self.shed),
+            }
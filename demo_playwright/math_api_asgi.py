@@ -0,0 +1,132 @@
+# math_api_asgi.py
+# Async (ASGI) build of the math API. Same routes and same compute() core as
+# playwright_key_function.py, written as a plain ASGI callable so it runs under
+# any ASGI server without an extra framework.
+#
+# Run: uvicorn math_api_asgi:app --host 127.0.0.1 --port 5001
+import asyncio
+import json
+from urllib.parse import parse_qs
+
+from math_heavy import HEAVY_OPS
+from playwright_key_function import (HOME_BODY, HOME_ETAG, HOME_MAX_AGE, PATH_MAX_AGE,
+                                     body_etag, evaluate_json)
+
+def _arg(query, name, default=None):
+    values = query.get(name)
+    return values[0] if values else default
+
+def _is_heavy(op):
+    return isinstance(op, str) and op.lower() in HEAVY_OPS
+
+async def _read_body(receive):
+    body = b""
+    more = True
+    while more:
+        message = await receive()
+        body += message.get("body", b"")
+        more = message.get("more_body", False)
+    return body
+
+async def _send_json(send, payload, status=200, body=None, headers=()):
+    if body is None:
+        body = json.dumps(payload).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            *headers,
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+def _etag_matches(scope, etag):
+    for name, value in scope.get("headers", ()):
+        if name == b"if-none-match":
+            tags = [t.strip() for t in value.decode("latin-1").split(",")]
+            return "*" in tags or any(t.removeprefix("W/") == f'"{etag}"' for t in tags)
+    return False
+
+async def _send_cacheable(scope, send, body, max_age, etag=None):
+    # strong ETag + public Cache-Control, 304 on a matching If-None-Match (as in the Flask app)
+    etag = etag or body_etag(body)
+    headers = [(b"etag", f'"{etag}"'.encode()), (b"cache-control", f"public, max-age={max_age}".encode())]
+    if _etag_matches(scope, etag):
+        await send({"type": "http.response.start", "status": 304, "headers": headers})
+        return await send({"type": "http.response.body", "body": b""})
+    await _send_json(send, None, 200, body, headers)
+
+def route(method, path, query):
+    """Resolve a GET request to (payload, status); / and POST /math are handled in app()."""
+    parts = [p for p in path.split("/") if p]
+
+    if method != "GET":
+        return {"error": "Method not allowed"}, 405
+
+    # Main endpoint (query params): /calc?op=add&a=5&b=10 and /math alias
+    if parts in (["calc"], ["math"]):
+        op = _arg(query, "op", ""); a = _arg(query, "a"); b = _arg(query, "b")
+        if a is None or b is None or not op:
+            return {"error": "Provide op, a, b (e.g., /calc?op=add&a=5&b=10)"}, 400
+        return evaluate_json({"op": op, "a": a, "b": b})
+
+    # Path op + query numbers: /math/add?a=5&b=10
+    if len(parts) == 2 and parts[0] == "math":
+        a = _arg(query, "a"); b = _arg(query, "b")
+        if a is None or b is None:
+            return {"error": "Provide a and b (e.g., /math/add?a=5&b=10)"}, 400
+        return evaluate_json({"op": parts[1], "a": a, "b": b})
+
+    # Pure path style: /math/add/5/10
+    if len(parts) == 4 and parts[0] == "math":
+        return evaluate_json({"op": parts[1], "a": parts[2], "b": parts[3]})
+
+    return {"error": "Not found"}, 404
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+    if scope["type"] != "http":
+        return
+
+    method, path = scope["method"], scope["path"]
+
+    # JSON body: POST /math  { "op": "add", "a": 5, "b": 10 }
+    if method == "POST" and path.rstrip("/") == "/math":
+        try:
+            data = json.loads(await _read_body(receive) or b"{}")
+        except ValueError:
+            data = {}
+        if _is_heavy(data.get("op") if isinstance(data, dict) else None):
+            payload, status = await asyncio.to_thread(evaluate_json, data)
+        else:
+            payload, status = evaluate_json(data or {})
+        return await _send_json(send, payload, status)
+
+    segments = [p for p in path.split("/") if p]
+    if method == "GET" and not segments:
+        return await _send_cacheable(scope, send, HOME_BODY, HOME_MAX_AGE, HOME_ETAG)
+
+    query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    parts = path.split("/")
+    if _is_heavy(_arg(query, "op")) or (len(parts) > 2 and _is_heavy(parts[2])):
+        # heavy ops wait on the process pool; keep that wait off the event loop
+        payload, status = await asyncio.to_thread(route, method, path, query)
+    else:
+        payload, status = route(method, path, query)
+    if status == 200 and len(segments) == 4 and segments[0] == "math":
+        return await _send_cacheable(scope, send, json.dumps(payload).encode(), PATH_MAX_AGE)
+    await _send_json(send, payload, status)
+
+if __name__ == "__main__":
+    # Run: python math_api_asgi.py  (needs: pip install uvicorn)
+    import uvicorn
+    uvicorn.run(app, host="127.0.0.1", port=5001, log_level="warning")
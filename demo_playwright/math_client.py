@@ -0,0 +1,451 @@
+# math_client.py
+# Client for the math API with a method per route, keep-alive connection
+# pooling, and a sync (MathClient) and an asyncio (AsyncMathClient) interface.
+#
+# compute(op, a, b) calls for the four basic ops are micro-batched: calls made
+# within `batch_window` seconds of each other (from many threads, or many
+# tasks on one event loop) go out as a single POST /math/batch and each caller
+# gets its own result back. batch_window=0 sends every call on its own.
+#
+#   with MathClient("http://127.0.0.1:5000") as c:
+#       c.compute("add", 5, 10)         # 15.0 (batched with concurrent calls)
+#       c.calc("divide", 10, 4)         # full JSON of GET /calc
+#
+#   async with AsyncMathClient("http://127.0.0.1:5000") as c:
+#       await asyncio.gather(*(c.compute("multiply", i, 2) for i in range(1000)))
+#
+# Standard library only.
+import asyncio
+import http.client
+import json
+import struct
+import sys
+import threading
+from array import array
+from concurrent.futures import Future
+from urllib.parse import quote, urlencode, urlsplit
+
+BATCH_OPS = ("add", "subtract", "multiply", "divide")  # the ops /math/batch accepts
+PACKED_HEADER = struct.Struct("<8sQ")  # same layout as the server's binary batch
+
+class MathAPIError(Exception):
+    """Non-2xx answer (status, decoded payload) or a per-element batch error (status None)."""
+
+    def __init__(self, message, status=None, payload=None):
+        super().__init__(message)
+        self.status = status
+        self.payload = payload
+
+def _decode(status, content_type, body):
+    if content_type.startswith("application/json"):
+        payload = json.loads(body or b"null")
+    elif content_type.startswith("application/x-ndjson"):
+        payload = [json.loads(line) for line in body.splitlines() if line.strip()]
+    elif content_type.startswith("text/"):
+        payload = body.decode("utf-8", "replace")
+    else:
+        payload = body
+    if status >= 400:
+        message = payload.get("error") if isinstance(payload, dict) else None
+        raise MathAPIError(message or f"HTTP {status}", status, payload)
+    return payload
+
+def _pack(op, a, b):
+    if len(a) != len(b):
+        raise ValueError("a and b must have the same length")
+    xs, ys = array("d", a), array("d", b)
+    if sys.byteorder == "big":
+        xs.byteswap(); ys.byteswap()
+    return PACKED_HEADER.pack(op.encode("ascii"), len(xs)) + xs.tobytes() + ys.tobytes()
+
+def _unpack(body):
+    # -> (results, flags); flags[i] == 1 marks a division by zero
+    _, n = PACKED_HEADER.unpack_from(body)
+    out = array("d")
+    out.frombytes(body[PACKED_HEADER.size:PACKED_HEADER.size + 8 * n])
+    if sys.byteorder == "big":
+        out.byteswap()
+    return out.tolist(), list(body[PACKED_HEADER.size + 8 * n:])
+
+def _batchable(op, a, b):
+    # numbers only: one non-numeric operand would fail the whole batch request
+    if not isinstance(op, str) or op.lower() not in BATCH_OPS:
+        return None
+    try:
+        return op.lower(), float(a), float(b)
+    except (TypeError, ValueError):
+        return None
+
+def _batch_body(calls):
+    return {"ops": [c[0] for c in calls], "a": [c[1] for c in calls], "b": [c[2] for c in calls]}
+
+def _batch_outcomes(payload, count):
+    # -> list of (result, error message or None), one per call
+    errors = {e["index"]: e["error"] for e in payload.get("errors", [])}
+    results = payload.get("results", [])
+    return [(results[i], errors.get(i)) for i in range(count)]
+
+class _Routes:
+    """
+    One method per route. Each builds a request and hands it to self._call,
+    which the sync client runs immediately and the async client returns as a
+    coroutine, so both share these definitions.
+    """
+
+    def home(self):
+        return self._call("GET", "/")
+
+    def calc(self, op, a, b):
+        """GET /calc?op=&a=&b= (query style)."""
+        return self._call("GET", "/calc?" + urlencode({"op": op, "a": a, "b": b}))
+
+    def math_query(self, op, a, b):
+        """GET /math/<op>?a=&b=."""
+        return self._call("GET", f"/math/{quote(str(op), safe='')}?" + urlencode({"a": a, "b": b}))
+
+    def math_path(self, op, a, b):
+        """GET /math/<op>/<a>/<b>."""
+        parts = (quote(str(x), safe="") for x in (op, a, b))
+        return self._call("GET", "/math/{}/{}/{}".format(*parts))
+
+    def post(self, op, a, b):
+        """POST /math with a JSON body; also the route for power and factorial."""
+        return self._call("POST", "/math", {"op": op, "a": a, "b": b})
+
+    def stream(self, items):
+        """POST /math/stream; items are {"op", "a", "b"} dicts, returns one result dict per item."""
+        body = "".join(json.dumps(item) + "\n" for item in items).encode()
+        return self._call("POST", "/math/stream", raw=body, content_type="application/x-ndjson")
+
+    def batch(self, op, a, b):
+        """POST /math/batch; op is one name or a list with one per element. a, b may be {"dataset": name}."""
+        key = "op" if isinstance(op, str) else "ops"
+        return self._call("POST", "/math/batch", {key: op, "a": a, "b": b})
+
+    def batch_packed(self, op, a, b):
+        """Binary POST /math/batch: returns (results, flags), flags[i] == 1 for division by zero."""
+        return self._call("POST", "/math/batch", raw=_pack(op, a, b),
+                          content_type="application/octet-stream", then=_unpack)
+
+    def reduce(self, op, a, b=None):
+        body = {"op": op, "a": a}
+        if b is not None:
+            body["b"] = b
+        return self._call("POST", "/math/reduce", body)
+
+    def matmul(self, a, b):
+        return self._call("POST", "/math/matmul", {"a": a, "b": b})
+
+    def expr(self, expr, vars=None, bindings=None):
+        """POST /math/expr with one set of vars, or many bindings at once."""
+        body = {"expr": expr}
+        if bindings is not None:
+            body["bindings"] = bindings
+        else:
+            body["vars"] = vars or {}
+        return self._call("POST", "/math/expr", body)
+
+    def dataset_put(self, values, name=None):
+        return self._call("POST", "/math/datasets", {"name": name, "values": list(values)})
+
+    def datasets(self):
+        return self._call("GET", "/math/datasets")
+
+    def dataset_delete(self, name):
+        return self._call("DELETE", f"/math/datasets/{quote(name, safe='')}")
+
+    def job_submit(self, op, a, b):
+        key = "op" if isinstance(op, str) else "ops"
+        return self._call("POST", "/math/jobs", {key: op, "a": a, "b": b})
+
+    def job(self, job_id, offset=0, limit=None):
+        query = {"offset": offset}
+        if limit is not None:
+            query["limit"] = limit
+        return self._call("GET", f"/math/jobs/{quote(job_id, safe='')}?" + urlencode(query))
+
+    def job_delete(self, job_id):
+        return self._call("DELETE", f"/math/jobs/{quote(job_id, safe='')}")
+
+    def stats(self):
+        return self._call("GET", "/stats")
+
+    def metrics(self):
+        return self._call("GET", "/metrics")
+
+# ---------- Sync ----------
+
+class _ConnectionPool:
+    """Idle keep-alive HTTPConnections, reused most recently used first."""
+
+    def __init__(self, host, port, size, timeout):
+        self.host, self.port, self.timeout = host, port, timeout
+        self._idle = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def request(self, method, path, body, headers):
+        self._slots.acquire()
+        try:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+            reused = conn is not None
+            while True:
+                if conn is None:
+                    conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+                try:
+                    conn.request(method, path, body, headers)
+                    resp = conn.getresponse()
+                    data = resp.read()
+                except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                    conn.close()
+                    if not reused:
+                        raise
+                    # the server closed an idle keep-alive connection: retry once on a new one
+                    conn, reused = None, False
+                    continue
+                except BaseException:
+                    conn.close()
+                    raise
+                if resp.will_close:
+                    conn.close()
+                else:
+                    with self._lock:
+                        self._idle.append(conn)
+                return resp.status, resp.getheader("Content-Type", ""), data
+        finally:
+            self._slots.release()
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+class _Batcher:
+    """Collects compute() calls for `window` seconds, then sends them as one batch."""
+
+    def __init__(self, client, window, max_size):
+        self.client, self.window, self.max_size = client, window, max_size
+        self._pending = []
+        self._cond = threading.Condition()
+        self._thread = None
+        self.batches = self.calls = 0
+
+    def submit(self, call):
+        fut = Future()
+        with self._cond:
+            self._pending.append((call, fut))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="math-batcher", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return fut
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                # let the window fill unless a full batch is already waiting
+                self._cond.wait_for(lambda: len(self._pending) >= self.max_size, self.window)
+                taken, self._pending = self._pending[:self.max_size], self._pending[self.max_size:]
+            self.batches += 1
+            self.calls += len(taken)
+            try:
+                payload = self.client.batch([c[0] for c, _ in taken],
+                                            [c[1] for c, _ in taken], [c[2] for c, _ in taken])
+            except Exception as e:
+                for _, fut in taken:
+                    fut.set_exception(e)
+                continue
+            for (_, fut), (result, error) in zip(taken, _batch_outcomes(payload, len(taken))):
+                if error is None:
+                    fut.set_result(result)
+                else:
+                    fut.set_exception(MathAPIError(error, None, payload))
+
+class MathClient(_Routes):
+    def __init__(self, base_url="http://127.0.0.1:5000", pool_size=10, timeout=10.0,
+                 batch_window=0.002, max_batch=1000):
+        url = urlsplit(base_url)
+        if url.scheme != "http":
+            raise ValueError("Only http:// base URLs are supported")
+        self._pool = _ConnectionPool(url.hostname, url.port or 80, pool_size, timeout)
+        self._batcher = _Batcher(self, batch_window, max_batch) if batch_window > 0 else None
+
+    def _call(self, method, path, json_body=None, raw=None, content_type=None, then=None):
+        headers = {}
+        if json_body is not None:
+            raw, content_type = json.dumps(json_body).encode(), "application/json"
+        if raw is not None:
+            headers["Content-Type"] = content_type
+        status, ctype, data = self._pool.request(method, path, raw, headers)
+        payload = _decode(status, ctype, data)
+        return then(payload) if then else payload
+
+    def compute(self, op, a, b):
+        """Result of op(a, b) as a number; raises MathAPIError on API errors."""
+        call = _batchable(op, a, b)
+        if call is None or self._batcher is None:
+            return self.post(op, a, b)["result"]
+        return self._batcher.submit(call).result()
+
+    def close(self):
+        self._pool.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# ---------- Async ----------
+
+async def _read_response(reader):
+    # -> (status, content type, body, keep_alive)
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionResetError("connection closed")
+    status = int(status_line.split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    keep_alive = not status_line.startswith(b"HTTP/1.0") and headers.get("connection", "").lower() != "close"
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            if size == 0:
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass  # trailers
+                break
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+        body = b"".join(chunks)
+    elif "content-length" in headers:
+        body = await reader.readexactly(int(headers["content-length"]))
+    else:
+        body, keep_alive = await reader.read(), False
+    return status, headers.get("content-type", ""), body, keep_alive
+
+class AsyncMathClient(_Routes):
+    def __init__(self, base_url="http://127.0.0.1:5000", pool_size=10, timeout=10.0,
+                 batch_window=0.002, max_batch=1000):
+        url = urlsplit(base_url)
+        if url.scheme != "http":
+            raise ValueError("Only http:// base URLs are supported")
+        self.host, self.port, self.timeout = url.hostname, url.port or 80, timeout
+        self.pool_size = pool_size
+        self.batch_window, self.max_batch = batch_window, max_batch
+        self._idle = []
+        self._slots = None  # created on first use, inside the running loop
+        self._pending = []
+        self._flush_handle = None
+        self._tasks = set()  # in-flight batches; the loop only keeps weak references to tasks
+        self.batches = self.calls = 0
+
+    async def _request(self, method, path, body, content_type):
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.pool_size)
+        head = f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+        if body is not None:
+            head += f"Content-Type: {content_type}\r\nContent-Length: {len(body)}\r\n"
+        raw = head.encode() + b"\r\n" + (body or b"")
+        async with self._slots:
+            conn = self._idle.pop() if self._idle else None
+            reused = conn is not None
+            while True:
+                if conn is None:
+                    conn = await asyncio.wait_for(asyncio.open_connection(self.host, self.port), self.timeout)
+                reader, writer = conn
+                try:
+                    writer.write(raw)
+                    status, ctype, data, keep_alive = await asyncio.wait_for(_read_response(reader), self.timeout)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    writer.close()
+                    if not reused:
+                        raise
+                    conn, reused = None, False  # stale keep-alive connection: retry once
+                    continue
+                except BaseException:
+                    writer.close()
+                    raise
+                if keep_alive:
+                    self._idle.append(conn)
+                else:
+                    writer.close()
+                return status, ctype, data
+
+    async def _call(self, method, path, json_body=None, raw=None, content_type=None, then=None):
+        if json_body is not None:
+            raw, content_type = json.dumps(json_body).encode(), "application/json"
+        status, ctype, data = await self._request(method, path, raw, content_type)
+        payload = _decode(status, ctype, data)
+        return then(payload) if then else payload
+
+    async def compute(self, op, a, b):
+        """Result of op(a, b) as a number; raises MathAPIError on API errors."""
+        call = _batchable(op, a, b)
+        if call is None or self.batch_window <= 0:
+            return (await self.post(op, a, b))["result"]
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._pending.append((call, fut))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_window, self._flush)
+        return await fut
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        taken, self._pending = self._pending, []
+        if taken:
+            task = asyncio.get_running_loop().create_task(self._send_batch(taken))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send_batch(self, taken):
+        self.batches += 1
+        self.calls += len(taken)
+        calls = [c for c, _ in taken]
+        try:
+            payload = await self._call("POST", "/math/batch", _batch_body(calls))
+        except asyncio.CancelledError:
+            for _, fut in taken:
+                fut.cancel()
+            raise
+        except Exception as e:
+            for _, fut in taken:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+        for (_, fut), (result, error) in zip(taken, _batch_outcomes(payload, len(taken))):
+            if fut.done():
+                continue  # caller was cancelled
+            if error is None:
+                fut.set_result(result)
+            else:
+                fut.set_exception(MathAPIError(error, None, payload))
+
+    async def close(self):
+        # send what is still waiting for the batch window, then let in-flight batches finish
+        self._flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        idle, self._idle = self._idle, []
+        for _, writer in idle:
+            writer.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
@@ -0,0 +1,125 @@
+# math_datasets.py
+# Server-side datasets: upload an operand array once, refer to it by name later.
+# Each dataset is a file of little-endian float64 values that is memory-mapped
+# on use, so large vectors are neither re-uploaded nor re-parsed per request.
+# When the total size passes max_bytes the least recently used datasets are
+# removed. The directory is the only state (file sizes, and access times set on
+# every use as the LRU order), so all serve.py workers list the same datasets
+# and share one byte budget.
+import mmap
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from array import array
+from contextlib import suppress
+
+NAME_RE = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+class DatasetStore:
+    def __init__(self, directory=None, max_bytes=1 << 30, numpy_or_none=lambda: None):
+        self.directory = directory or os.path.join(tempfile.gettempdir(), "math_datasets")
+        self.max_bytes = max_bytes
+        self.numpy_or_none = numpy_or_none
+        self._lock = threading.Lock()
+        self.evictions = 0  # by this process
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, name):
+        return os.path.join(self.directory, name + ".f8")
+
+    def _scan(self):
+        # (name, stat) of every stored dataset, least recently used first
+        found = []
+        for entry in os.scandir(self.directory):
+            name = entry.name[:-3]
+            if entry.name.endswith(".f8") and NAME_RE.match(name):
+                with suppress(FileNotFoundError):  # deleted by another worker meanwhile
+                    found.append((name, entry.stat()))
+        found.sort(key=lambda item: item[1].st_atime_ns)
+        return found
+
+    def put(self, name, raw):
+        """Store raw little-endian float64 bytes under `name` (generated when None)."""
+        if name is None:
+            name = uuid.uuid4().hex
+        if not NAME_RE.match(name):
+            raise ValueError("Dataset name may only use letters, digits, '_' and '-' (max 64)")
+        if not raw or len(raw) % 8:
+            raise ValueError("Dataset must be a non-empty sequence of float64 values")
+        if len(raw) > self.max_bytes:
+            raise ValueError(f"Dataset too large ({len(raw)} > {self.max_bytes} bytes)")
+        tmp = self._path(name) + f".{uuid.uuid4().hex}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(raw)
+        os.replace(tmp, self._path(name))  # readers see either the old or the new file
+        with self._lock:
+            self._evict(keep=name)
+        return self.info(name)
+
+    def put_values(self, name, values):
+        arr = array("d", (float(v) for v in values))
+        if sys.byteorder == "big":
+            arr.byteswap()
+        return self.put(name, arr.tobytes())
+
+    def _evict(self, keep):
+        entries = self._scan()
+        total = sum(st.st_size for _, st in entries)
+        for old, st in entries:
+            if total <= self.max_bytes:
+                break
+            if old == keep:
+                continue
+            total -= st.st_size
+            with suppress(FileNotFoundError):  # another worker evicted it first
+                os.remove(self._path(old))
+                self.evictions += 1
+
+    def get(self, name):
+        """Memory-mapped values of `name` (NumPy array, or memoryview of doubles), None if unknown."""
+        if not NAME_RE.match(name):
+            return None
+        try:
+            with open(self._path(name), "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                st = os.fstat(f.fileno())
+            # mark it used for the LRU order (explicitly: relatime/noatime mounts skip reads)
+            with suppress(OSError):
+                os.utime(self._path(name), ns=(time.time_ns(), st.st_mtime_ns))
+        except (FileNotFoundError, ValueError):
+            return None
+        np = self.numpy_or_none()
+        if np is not None:
+            return np.frombuffer(mm, dtype="<f8")
+        if sys.byteorder == "big":
+            arr = array("d")
+            arr.frombytes(mm)
+            arr.byteswap()
+            return arr
+        return memoryview(mm).cast("d")
+
+    def delete(self, name):
+        if not NAME_RE.match(name):
+            return False
+        try:
+            os.remove(self._path(name))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def info(self, name, st=None):
+        st = st or os.stat(self._path(name))
+        return {"dataset": name, "count": st.st_size // 8, "bytes": st.st_size,
+                "modified": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(st.st_mtime))}
+
+    def list(self):
+        return [self.info(name, st) for name, st in self._scan()]
+
+    def stats(self):
+        entries = self._scan()
+        return {"count": len(entries), "bytes": sum(st.st_size for _, st in entries),
+                "max_bytes": self.max_bytes, "evictions": self.evictions}
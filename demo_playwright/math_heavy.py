@@ -0,0 +1,167 @@
+# math_heavy.py
+# "Heavy" operations (power, factorial) that can pin a CPU for a long time.
+# They run in a small pool of worker processes so they never hold the GIL of
+# the process serving requests. Every call has a time budget; when it runs
+# out the worker process is killed (that is the cancellation) and replaced.
+#
+# Integer results that do not fit a float exactly come back as decimal strings.
+import math
+import os
+import sys
+import threading
+
+MAX_RESULT_DIGITS = int(os.environ.get("MATH_MAX_RESULT_DIGITS", "100000"))
+
+class HeavyTimeout(Exception):
+    pass
+
+class HeavyBusy(Exception):
+    pass
+
+def _integral(x):
+    return math.isfinite(x) and x == int(x)
+
+def _as_result(value):
+    if isinstance(value, int):
+        if abs(value) <= 2 ** 53:
+            return float(value)
+        return str(value)  # exact digits; JSON floats would lose them
+    return value
+
+def power(a, b):
+    if _integral(a) and _integral(b) and b >= 0:
+        base, exp = int(a), int(b)
+        if abs(base) > 1 and exp * math.log10(abs(base)) > MAX_RESULT_DIGITS:
+            raise ValueError(f"Result would have more than {MAX_RESULT_DIGITS} digits")
+        return _as_result(base ** exp)
+    if a == 0 and b < 0:
+        raise ValueError("Zero cannot be raised to a negative power")
+    if a < 0 and not _integral(b):
+        raise ValueError("Negative base needs an integer exponent")
+    try:
+        return math.pow(a, b)
+    except OverflowError:
+        raise ValueError("Result too large")
+
+def factorial(a, b=None):
+    # b is ignored so the op fits the (op, a, b) routes: /math/factorial/20/0
+    if not _integral(a) or a < 0:
+        raise ValueError("Factorial needs a non-negative integer a")
+    n = int(a)
+    if n > 1 and math.lgamma(n + 1) / math.log(10) > MAX_RESULT_DIGITS:
+        raise ValueError(f"Result would have more than {MAX_RESULT_DIGITS} digits")
+    return _as_result(math.factorial(n))
+
+HEAVY_FUNCS = {"power": power, "factorial": factorial}
+HEAVY_OPS = tuple(HEAVY_FUNCS)
+
+def _serve(conn):
+    # worker process loop: (op, args) in, ("ok", value) / ("error", kind, message) out
+    if hasattr(sys, "set_int_max_str_digits"):
+        sys.set_int_max_str_digits(0)
+    while True:
+        try:
+            op, args = conn.recv()
+        except (EOFError, OSError):
+            return
+        try:
+            conn.send(("ok", HEAVY_FUNCS[op](*args)))
+        except ValueError as e:
+            conn.send(("error", "value", str(e)))
+        except Exception as e:
+            conn.send(("error", "other", f"{type(e).__name__}: {e}"))
+
+class _Worker:
+    def __init__(self, ctx):
+        self.conn, child = ctx.Pipe()
+        self.proc = ctx.Process(target=_serve, args=(child,), daemon=True)
+        self.proc.start()
+        child.close()
+
+    def kill(self):
+        self.proc.kill()
+        self.proc.join(1)
+        self.conn.close()
+
+class HeavyPool:
+    """
+    At most `workers` heavy calls run at once, each in its own process.
+    run() waits up to `queue_timeout` for a free worker (else HeavyBusy) and
+    `timeout` for the answer (else the worker is killed and HeavyTimeout raised).
+    Processes are started lazily, so importing this module forks nothing (and
+    does not import multiprocessing until the first call).
+    """
+
+    def __init__(self, workers=2, timeout=2.0, queue_timeout=1.0):
+        self.size = workers
+        self.timeout = timeout
+        self.queue_timeout = queue_timeout
+        self._ctx = None
+        self._lock = threading.Lock()
+        self._reset()
+        self.calls = self.timeouts = self.busy = 0
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._idle = []
+        self._slots = threading.BoundedSemaphore(self.size)
+
+    def run(self, op, args, timeout=None):
+        with self._lock:
+            if self._pid != os.getpid():
+                self._reset()  # forked (e.g. serve.py workers): the parent's processes are not ours
+            slots = self._slots
+        if not slots.acquire(timeout=self.queue_timeout):
+            self.busy += 1
+            raise HeavyBusy("All heavy-operation workers are busy")
+        worker = None
+        try:
+            with self._lock:
+                worker = self._idle.pop() if self._idle else None
+            if worker is None or not worker.proc.is_alive():
+                if self._ctx is None:
+                    # not fork: a forked worker would inherit the listening socket and the
+                    # other workers' pipe ends, and outlive a serve.py worker that exits
+                    import multiprocessing
+                    methods = multiprocessing.get_all_start_methods()
+                    self._ctx = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+                worker = _Worker(self._ctx)
+            self.calls += 1
+            worker.conn.send((op, args))
+            if not worker.conn.poll(self.timeout if timeout is None else timeout):
+                worker.kill()
+                worker = None
+                self.timeouts += 1
+                raise HeavyTimeout(f"'{op}' exceeded its {self.timeout if timeout is None else timeout}s time budget")
+            reply = worker.conn.recv()
+        except (EOFError, OSError):
+            if worker is not None:
+                worker.kill()
+                worker = None
+            raise RuntimeError("Heavy-operation worker died")
+        finally:
+            if worker is not None:
+                with self._lock:
+                    self._idle.append(worker)
+            slots.release()
+        if reply[0] == "ok":
+            return reply[1]
+        if reply[1] == "value":
+            raise ValueError(reply[2])
+        raise RuntimeError(reply[2])
+
+    def shutdown(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.kill()
+
+    def stats(self):
+        return {
+            "workers": self.size,
+            "idle": len(self._idle),
+            "timeout": self.timeout,
+            "calls": self.calls,
+            "timeouts": self.timeouts,
+            "busy": self.busy,
+        }
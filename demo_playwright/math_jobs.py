@@ -0,0 +1,281 @@
+# math_jobs.py
+# Background jobs for very large math batches (POST /math/jobs).
+#
+# A submitted batch is written to disk right away (a and b as little-endian
+# float64 files, per-element ops as one-byte codes into a small name table in
+# ops.json), so queued jobs hold no operands in memory. Worker threads process
+# it in chunks, reading operands and op codes chunk by chunk, and append
+# results to disk:
+#   results.f8     one float64 per element (NaN where the element failed)
+#   errors.ndjson  {"index": i, "error": "..."} per failed element
+#   meta.json      status, progress and owner pid, rewritten after every chunk
+# Clients poll the job and read results back in slices by offset. Job state
+# lives on disk, so any serve.py worker can answer for a job another worker
+# runs; a job whose owner process is gone (recycled worker) is reported failed.
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext, suppress
+
+ID_RE = re.compile(r"^[0-9a-f]{32}$")
+META_FIELDS = ("status", "op", "total", "processed", "error_count", "error", "created", "finished", "pid")
+
+def _to_le(arr):
+    if sys.byteorder == "big":
+        arr.byteswap()
+    return arr
+
+def _alive(pid):
+    if os.name == "nt":  # os.kill(pid, 0) would terminate the process on Windows
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+class Job:
+    def __init__(self, job_id, directory, total, op):
+        self.id = job_id
+        self.dir = directory
+        self.total = total
+        self.op = op if isinstance(op, str) else "mixed"
+        self.status = "queued"
+        self.processed = 0
+        self.error_count = 0
+        self.error = None
+        self.created = time.time()
+        self.finished = None
+        self.pid = os.getpid()  # process running the job
+
+    def save(self):
+        # atomic rewrite: other workers read meta.json while this one updates it
+        meta = {name: getattr(self, name) for name in META_FIELDS}
+        tmp = os.path.join(self.dir, f"meta.{uuid.uuid4().hex}.tmp")
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, os.path.join(self.dir, "meta.json"))
+
+    @classmethod
+    def load(cls, job_id, directory):
+        """Job from <directory>/meta.json, None if it does not exist (or is unreadable)."""
+        try:
+            with open(os.path.join(directory, "meta.json")) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        job = cls(job_id, directory, meta["total"], meta["op"])
+        for name in META_FIELDS:
+            setattr(job, name, meta.get(name))
+        if job.status in ("queued", "running") and not _alive(job.pid):
+            job.status = "failed"
+            job.error = "Worker process exited before the job finished"
+            job.finished = time.time()
+            with suppress(OSError):
+                job.save()
+        return job
+
+    def info(self):
+        return {
+            "id": self.id,
+            "status": self.status,
+            "operation": self.op,
+            "total": self.total,
+            "processed": self.processed,
+            "error_count": self.error_count,
+            "error": self.error,
+            "created": self.created,
+            "finished": self.finished,
+        }
+
+class JobManager:
+    """
+    compute_batch: fn(op, a, b) -> (results, errors), run once per chunk
+    directory:     where job files are spilled
+    workers:       jobs processed at the same time
+    chunk_size:    elements computed (and held in memory) per step
+    ttl:           seconds a finished job is kept before its files are removed
+    """
+
+    def __init__(self, compute_batch, directory=None, workers=2, chunk_size=100_000, ttl=3600.0):
+        self.compute_batch = compute_batch
+        self.directory = directory or os.path.join(tempfile.gettempdir(), "math_jobs")
+        self.chunk_size = chunk_size
+        self.ttl = ttl
+        self.jobs = {}  # jobs queued or running in this process (others are read from disk)
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(workers, thread_name_prefix="math-job")
+        os.makedirs(self.directory, exist_ok=True)
+
+    def submit(self, op, a, b):
+        """Validate and spill the batch to disk, queue it and return the Job."""
+        n = len(a)
+        if len(b) != n:
+            raise ValueError("a and b must have the same length")
+        if not isinstance(op, str) and len(op) != n:
+            raise ValueError("ops must have the same length as a and b")
+        a_arr = _to_le(array("d", (float(x) for x in a)))
+        b_arr = _to_le(array("d", (float(x) for x in b)))
+        codes = None
+        if not isinstance(op, str):
+            # normalized as compute_batch reads ops; unknown names keep their own
+            # code so each failing element still reports the name it was sent
+            table = {}
+            try:
+                codes = array("B", (table.setdefault(str(o or "").lower(), len(table)) for o in op))
+            except OverflowError:
+                raise ValueError("ops may use at most 256 distinct operation names")
+            op = list(table)
+
+        self.expire()
+        job = Job(uuid.uuid4().hex, None, n, op)
+        job.dir = os.path.join(self.directory, job.id)
+        os.makedirs(job.dir)
+        with open(os.path.join(job.dir, "a.f8"), "wb") as f:
+            a_arr.tofile(f)
+        with open(os.path.join(job.dir, "b.f8"), "wb") as f:
+            b_arr.tofile(f)
+        with open(os.path.join(job.dir, "ops.json"), "w") as f:
+            json.dump(op, f)  # the op, or the name table for the codes in ops.u1
+        if codes is not None:
+            with open(os.path.join(job.dir, "ops.u1"), "wb") as f:
+                codes.tofile(f)
+        job.save()
+        with self._lock:
+            self.jobs[job.id] = job
+        self._pool.submit(self._run, job)
+        return job
+
+    def _run(self, job):
+        job.status = "running"
+        try:
+            job.save()
+            with open(os.path.join(job.dir, "ops.json")) as f:
+                op = json.load(f)
+            mixed = not isinstance(op, str)
+            with open(os.path.join(job.dir, "a.f8"), "rb") as fa, \
+                 open(os.path.join(job.dir, "b.f8"), "rb") as fb, \
+                 (open(os.path.join(job.dir, "ops.u1"), "rb") if mixed else nullcontext()) as fo, \
+                 open(os.path.join(job.dir, "results.f8"), "wb") as fr, \
+                 open(os.path.join(job.dir, "errors.ndjson"), "w") as fe:
+                for start in range(0, job.total, self.chunk_size):
+                    count = min(self.chunk_size, job.total - start)
+                    a = array("d"); a.fromfile(fa, count); _to_le(a)
+                    b = array("d"); b.fromfile(fb, count); _to_le(b)
+                    chunk_op = op
+                    if mixed:
+                        codes = array("B"); codes.fromfile(fo, count)
+                        chunk_op = [op[c] for c in codes]
+                    results, errors = self.compute_batch(chunk_op, a, b)
+                    out = array("d", (float("nan") if r is None else r for r in results))
+                    _to_le(out).tofile(fr)
+                    for e in errors:
+                        fe.write(json.dumps({"index": start + e["index"], "error": e["error"]}) + "\n")
+                    fr.flush(); fe.flush()
+                    job.error_count += len(errors)
+                    job.processed = start + count
+                    job.save()  # fails (and stops the job) once the job was deleted
+            job.status = "done"
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            job.finished = time.time()
+            for name in ("a.f8", "b.f8", "ops.json", "ops.u1"):
+                with suppress(FileNotFoundError):
+                    os.remove(os.path.join(job.dir, name))
+            with suppress(OSError):
+                job.save()
+            with self._lock:
+                self.jobs.pop(job.id, None)
+
+    def drain(self, timeout):
+        """Wait up to `timeout` seconds for this process's queued and running jobs; True once none are left."""
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                if not self.jobs:
+                    return True
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.1)
+
+    def get(self, job_id):
+        if not ID_RE.match(job_id):
+            return None
+        with self._lock:
+            job = self.jobs.get(job_id)
+        if job is not None:
+            return job
+        # finished here, or submitted to another worker process: read its state from disk
+        return Job.load(job_id, os.path.join(self.directory, job_id))
+
+    def read(self, job, offset, limit):
+        """Results [offset, offset + limit) that are already computed, with their errors."""
+        end = min(offset + limit, job.processed)
+        if offset >= end:
+            return [], []
+        out = array("d")
+        results, errors = [], []
+        try:
+            with open(os.path.join(job.dir, "results.f8"), "rb") as f:
+                f.seek(offset * 8)
+                out.fromfile(f, end - offset)
+            results = _to_le(out).tolist()
+            with open(os.path.join(job.dir, "errors.ndjson")) as f:
+                for line in f:
+                    e = json.loads(line)
+                    if e["index"] >= end:
+                        break
+                    if e["index"] >= offset:
+                        errors.append(e)
+                        results[e["index"] - offset] = None
+        except (FileNotFoundError, EOFError):
+            return [], []  # deleted meanwhile
+        return results, errors
+
+    def delete(self, job_id):
+        job = self.get(job_id)
+        if job is not None:
+            with self._lock:
+                self.jobs.pop(job_id, None)
+            shutil.rmtree(job.dir, ignore_errors=True)
+        return job
+
+    def _scan(self):
+        # every job directory on disk, whichever worker process created it
+        with suppress(FileNotFoundError):
+            for entry in os.scandir(self.directory):
+                if entry.is_dir() and ID_RE.match(entry.name):
+                    yield entry
+
+    def expire(self):
+        # drop finished jobs older than ttl (called on every submit); a directory
+        # without meta.json (crashed mid-submit) goes once it is older than ttl
+        now = time.time()
+        for entry in self._scan():
+            job = Job.load(entry.name, entry.path)
+            if job is None:
+                with suppress(OSError):
+                    if now - entry.stat().st_mtime > self.ttl:
+                        shutil.rmtree(entry.path, ignore_errors=True)
+            elif job.finished and now - job.finished > self.ttl:
+                shutil.rmtree(entry.path, ignore_errors=True)
+
+    def stats(self):
+        counts = {}
+        for entry in self._scan():
+            job = Job.load(entry.name, entry.path)
+            if job is not None:
+                counts[job.status] = counts.get(job.status, 0) + 1
+        return {"directory": self.directory, "jobs": counts}
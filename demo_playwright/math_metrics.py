@@ -0,0 +1,137 @@
+# math_metrics.py
+# Request counters and latency histograms for the math API, rendered in the
+# Prometheus text exposition format on /metrics.
+#
+# Recording is lock-free: every thread writes into its own shard (plain dicts
+# reached through threading.local). The lock is only taken when a thread
+# registers its shard and when /metrics merges the shards, so leaving this on
+# under full load costs a dict update and a bisect per request.
+import bisect
+import threading
+
+# Upper bounds in seconds; +Inf is implicit
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+class _Shard:
+    def __init__(self, thread, nbuckets):
+        self.thread = thread
+        self.nbuckets = nbuckets
+        self.requests = {}    # (route, method, status) -> count
+        self.histograms = {}  # (family, label) -> [bucket counts..., +Inf count, sum]
+
+    def merge_into(self, other):
+        for key, n in self.requests.copy().items():
+            other.requests[key] = other.requests.get(key, 0) + n
+        for key, h in self.histograms.copy().items():
+            total = other.histograms.setdefault(key, [0] * (self.nbuckets + 1) + [0.0])
+            for i, v in enumerate(h):
+                total[i] += v
+
+class Metrics:
+    """Per-thread sharded counters and histograms with a Prometheus text renderer."""
+
+    def __init__(self, prefix="math", buckets=BUCKETS):
+        self.prefix = prefix
+        self.buckets = tuple(buckets)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards = []
+        self._retired = _Shard(None, len(self.buckets))  # totals from threads that exited
+        self._collectors = []  # (name, type, help, fn) sampled at render time
+
+    def _shard(self):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = _Shard(threading.current_thread(), len(self.buckets))
+            with self._lock:
+                self._fold_dead()
+                self._shards.append(shard)
+        return shard
+
+    def _fold_dead(self):
+        # Thread-per-connection servers would otherwise leave one shard per connection
+        alive = []
+        for shard in self._shards:
+            if shard.thread.is_alive():
+                alive.append(shard)
+            else:
+                shard.merge_into(self._retired)
+        self._shards = alive
+
+    def _observe(self, shard, key, seconds):
+        h = shard.histograms.get(key)
+        if h is None:
+            h = shard.histograms[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        h[bisect.bisect_left(self.buckets, seconds)] += 1
+        h[-1] += seconds
+
+    def observe(self, route, method, status, seconds, op=None):
+        """Record one finished request; `op` adds a sample to the per-op histogram."""
+        shard = self._shard()
+        key = (route, method, status)
+        shard.requests[key] = shard.requests.get(key, 0) + 1
+        self._observe(shard, ("route", route), seconds)
+        if op is not None:
+            self._observe(shard, ("op", op), seconds)
+
+    def observe_phase(self, phase, seconds):
+        self._observe(self._shard(), ("phase", phase), seconds)
+
+    def add_collector(self, name, kind, help_text, fn):
+        """
+        Export state owned elsewhere (queue depth, shed counts...). `fn()` returns a
+        list of (labels dict, value) and is called on every /metrics scrape.
+        """
+        self._collectors.append((name, kind, help_text, fn))
+
+    def snapshot(self):
+        total = _Shard(None, len(self.buckets))
+        with self._lock:
+            self._fold_dead()
+            self._retired.merge_into(total)
+            for shard in self._shards:
+                shard.merge_into(total)
+        return total
+
+    def render(self):
+        snap = self.snapshot()
+        p = self.prefix
+        lines = [
+            f"# HELP {p}_requests_total Requests by route, method and status.",
+            f"# TYPE {p}_requests_total counter",
+        ]
+        for (route, method, status), n in sorted(snap.requests.items()):
+            lines.append(f'{p}_requests_total{{route="{_esc(route)}",method="{method}",status="{status}"}} {n}')
+
+        families = {
+            "route": ("request_duration_seconds", "Request latency by route."),
+            "op": ("op_duration_seconds", "Request latency by operation."),
+            "phase": ("phase_duration_seconds", "Time spent per request phase (Server-Timing)."),
+        }
+        for family, (name, help_text) in families.items():
+            rows = sorted((label, h) for (fam, label), h in snap.histograms.items() if fam == family)
+            if not rows:
+                continue
+            lines.append(f"# HELP {p}_{name} {help_text}")
+            lines.append(f"# TYPE {p}_{name} histogram")
+            for label, h in rows:
+                tag = f'{family}="{_esc(label)}"'
+                running = 0
+                for bound, n in zip(self.buckets, h):
+                    running += n
+                    lines.append(f'{p}_{name}_bucket{{{tag},le="{bound}"}} {running}')
+                running += h[len(self.buckets)]
+                lines.append(f'{p}_{name}_bucket{{{tag},le="+Inf"}} {running}')
+                lines.append(f"{p}_{name}_sum{{{tag}}} {h[-1]:.6f}")
+                lines.append(f"{p}_{name}_count{{{tag}}} {running}")
+
+        for name, kind, help_text, fn in self._collectors:
+            lines.append(f"# HELP {p}_{name} {help_text}")
+            lines.append(f"# TYPE {p}_{name} {kind}")
+            for labels, value in fn():
+                tag = ",".join(f'{k}="{_esc(v)}"' for k, v in labels.items())
+                lines.append(f"{p}_{name}{{{tag}}} {value}" if tag else f"{p}_{name} {value}")
+        return "\n".join(lines) + "\n"
+
+def _esc(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
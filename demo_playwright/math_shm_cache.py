@@ -0,0 +1,183 @@
+# math_shm_cache.py
+# Result cache shared by every worker process on a host.
+#
+# The table lives in one shared memory mapping (anonymous when created before
+# serve.py forks its workers, or a file under /dev/shm for unrelated
+# processes). It is a set-associative hash table of fixed-size slots:
+# a key hashes to a bucket of WAYS slots, and a full bucket evicts with a
+# clock (second-chance) sweep over its reference bits.
+#
+# Lookups take no lock. Each slot carries a sequence number that writers make
+# odd while they rewrite the slot (seqlock); a reader copies the slot and
+# retries if the number was odd or changed underneath it. Writers serialize
+# per bucket stripe, never globally: a multiprocessing.Lock per stripe for the
+# anonymous mapping (shared through fork), a byte-range file lock per stripe
+# for the /dev/shm file (shared by unrelated processes).
+import hashlib
+import mmap
+import multiprocessing
+import os
+import struct
+import threading
+import time
+
+# seq, ref bit, status, key length, value length, key hash, expires (0 = never)
+SLOT_HEADER = struct.Struct("<IBxHHIQd2x")
+WAYS = 4
+STRIPES = 64
+
+def _key_bytes(key):
+    return repr(key).encode()
+
+def _hash(kb):
+    return int.from_bytes(hashlib.blake2b(kb, digest_size=8).digest(), "little")
+
+class _FileStripeLock:
+    # fcntl locks belong to the process, so threads of one process also need the
+    # threading.Lock to exclude each other
+    def __init__(self, fd, stripe):
+        import fcntl
+        self._fcntl = fcntl
+        self._fd = fd
+        self._stripe = stripe
+        self._thread_lock = threading.Lock()
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        try:
+            self._fcntl.lockf(self._fd, self._fcntl.LOCK_EX, 1, self._stripe)
+        except BaseException:
+            self._thread_lock.release()
+            raise
+
+    def __exit__(self, *exc):
+        try:
+            self._fcntl.lockf(self._fd, self._fcntl.LOCK_UN, 1, self._stripe)
+        finally:
+            self._thread_lock.release()
+
+class SharedResultCache:
+    """
+    Same interface as math_cache.ResultCache (get/put/stats); values are
+    (body bytes, status) pairs. Entries that do not fit a slot are not cached.
+    Counters are per process (each worker reports its own view).
+    """
+
+    def __init__(self, slots=65536, slot_size=512, ttl=60.0, path=None):
+        self.buckets = max(1, slots // WAYS)
+        self.slots = self.buckets * WAYS
+        self.slot_size = slot_size
+        self.ttl = ttl
+        self.capacity = slot_size - SLOT_HEADER.size
+        size = self.slots * slot_size
+        if path:
+            # kept open: closing any descriptor of the file drops this process's locks on it
+            self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+            if os.fstat(self._fd).st_size < size:
+                os.ftruncate(self._fd, size)
+            self._mm = mmap.mmap(self._fd, size)
+            self._locks = [_FileStripeLock(self._fd, i) for i in range(STRIPES)]
+        else:
+            self._mm = mmap.mmap(-1, size)  # MAP_SHARED: forked children see the same pages
+            self._locks = [multiprocessing.Lock() for _ in range(STRIPES)]
+        self.hits = self.misses = self.evictions = self.expirations = self.skipped = 0
+
+    def _read(self, off, h):
+        # seqlock read: (header, slot bytes) for a slot holding hash h, None otherwise
+        mm = self._mm
+        for _ in range(3):
+            if SLOT_HEADER.unpack_from(mm, off)[5] != h:
+                return None  # cheap reject before copying the slot
+            raw = mm[off:off + self.slot_size]
+            header = SLOT_HEADER.unpack_from(raw)
+            if header[0] & 1:
+                continue
+            if struct.unpack_from("<I", mm, off)[0] == header[0]:
+                return header, raw
+        return None
+
+    def get(self, key):
+        kb = _key_bytes(key)
+        h = _hash(kb)
+        base = (h % self.buckets) * WAYS * self.slot_size
+        for way in range(WAYS):
+            off = base + way * self.slot_size
+            got = self._read(off, h)
+            if got is None:
+                continue
+            (seq, ref, status, klen, vlen, _, expires), raw = got
+            start = SLOT_HEADER.size
+            if seq == 0 or raw[start:start + klen] != kb:
+                continue
+            if expires and expires <= time.time():
+                self.expirations += 1
+                break
+            if not ref:
+                self._mm[off + 4] = 1  # second chance for the clock sweep
+            self.hits += 1
+            return raw[start + klen:start + klen + vlen], status
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        body, status = value
+        kb = _key_bytes(key)
+        if len(kb) + len(body) > self.capacity:
+            self.skipped += 1
+            return
+        h = _hash(kb)
+        bucket = h % self.buckets
+        base = bucket * WAYS * self.slot_size
+        expires = time.time() + self.ttl if self.ttl > 0 else 0.0
+        mm = self._mm
+        with self._locks[bucket % STRIPES]:
+            victim = None
+            headers = [SLOT_HEADER.unpack_from(mm, base + w * self.slot_size) for w in range(WAYS)]
+            for w, (seq, ref, _, klen, _, kh, _) in enumerate(headers):
+                off = base + w * self.slot_size + SLOT_HEADER.size
+                if seq == 0 or (kh == h and mm[off:off + klen] == kb):
+                    victim = w
+                    break
+            if victim is None:
+                # clock sweep: clear reference bits until an unreferenced slot turns up
+                for _ in range(2):
+                    for w in range(WAYS):
+                        off = base + w * self.slot_size
+                        if mm[off + 4]:
+                            mm[off + 4] = 0
+                        elif victim is None:
+                            victim = w
+                    if victim is not None:
+                        break
+                self.evictions += 1
+            off = base + victim * self.slot_size
+            seq = struct.unpack_from("<I", mm, off)[0]
+            struct.pack_into("<I", mm, off, (seq + 1) | 1)  # odd: readers back off
+            start = off + SLOT_HEADER.size
+            mm[start:start + len(kb)] = kb
+            mm[start + len(kb):start + len(kb) + len(body)] = body
+            SLOT_HEADER.pack_into(mm, off, (seq + 1) | 1, 1, status, len(kb), len(body), h, expires)
+            struct.pack_into("<I", mm, off, (seq | 1) + 1)  # even, last: the slot is readable again
+
+    def clear(self):
+        for bucket in range(self.buckets):
+            with self._locks[bucket % STRIPES]:
+                for w in range(WAYS):
+                    # seq 0 marks the slot empty; a reader mid-copy sees the change and retries
+                    SLOT_HEADER.pack_into(self._mm, (bucket * WAYS + w) * self.slot_size, 0, 0, 0, 0, 0, 0, 0.0)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "shared": True,
+            "pid": os.getpid(),
+            "slots": self.slots,
+            "slot_size": self.slot_size,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "skipped": self.skipped,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,43 @@
+# math_timing.py
+# Per-request phase timing for the math API (parse, float, compute, json).
+# Handlers wrap each phase in `with phase("name"):`; when no recorder is active
+# for the current request that costs one ContextVar lookup. The collected
+# durations are turned into a Server-Timing header by the app.
+from contextvars import ContextVar
+from time import perf_counter_ns
+
+_current = ContextVar("math_timings", default=None)
+
+def start():
+    """Begin recording for the current request; returns a token for stop()."""
+    return _current.set({})
+
+def stop(token):
+    """Stop recording and return {phase: nanoseconds}."""
+    timings = _current.get()
+    _current.reset(token)
+    return timings or {}
+
+class phase:
+    __slots__ = ("name", "timings", "t0")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.timings = _current.get()
+        if self.timings is not None:
+            self.t0 = perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.timings is not None:
+            self.timings[self.name] = self.timings.get(self.name, 0) + perf_counter_ns() - self.t0
+        return False
+
+def server_timing_header(timings, total_ns=None):
+    # Server-Timing durations are in milliseconds
+    parts = [f"{name};dur={ns / 1e6:.3f}" for name, ns in timings.items()]
+    if total_ns is not None:
+        parts.append(f"total;dur={total_ns / 1e6:.3f}")
+    return ", ".join(parts)
@@ -1,7 +1,142 @@
 # math_api.py
-from flask import Flask, request, jsonify
+import ast
+import hashlib
+import json
+import logging
+import os
+import random
+import struct
+import sys
+import threading
+import time
+from array import array
+from functools import lru_cache
 
-app = Flask(__name__)
+from flask import Blueprint, Flask, Response, g, request, jsonify, stream_with_context
+
+from math_admission import AdmissionController
+from math_cache import SingleFlight
+from math_heavy import HEAVY_OPS, HeavyBusy, HeavyTimeout
+from math_metrics import Metrics
+from math_timing import phase, server_timing_header
+import math_timing
+
+# Routes live on a blueprint so Flask_structure.create_app() can mount them next
+# to other services; `app` (built on first access, see __getattr__ at the end)
+# is the standalone math API.
+bp = Blueprint("math", __name__)
+
+class Lazy:
+    """Stands in for an object that is built (once, thread-safe) on first attribute access."""
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._obj = None
+        self._lock = threading.Lock()
+
+    @property
+    def built(self):
+        return self._obj is not None
+
+    def _get(self):
+        if self._obj is None:
+            with self._lock:
+                if self._obj is None:
+                    self._obj = self._factory()
+        return self._obj
+
+    def __getattr__(self, name):
+        return getattr(self._get(), name)
+
+OPS = ("add", "subtract", "multiply", "divide")
+MAX_BATCH = 1_000_000  # elements per /math/batch request
+MAX_PACKED_BATCH = 10_000_000  # elements per binary (octet-stream) batch
+MAX_MATRIX_CELLS = 4_000_000  # elements per matmul operand and per result
+MATMUL_STREAM_CELLS = 10_000  # larger results are streamed row by row
+MAX_EXPR_LEN = 500       # characters per /math/expr formula
+EXPR_CACHE_SIZE = 256    # compiled formulas kept in the LRU
+
+# Optional result cache for the GET routes: MATH_CACHE_SIZE=10000 MATH_CACHE_TTL=60
+RESULT_CACHE_SIZE = int(os.environ.get("MATH_CACHE_SIZE", "0"))  # 0 disables
+RESULT_CACHE_TTL = float(os.environ.get("MATH_CACHE_TTL", "60"))  # seconds, 0 = no expiry
+result_cache = None
+if RESULT_CACHE_SIZE > 0:
+    from math_cache import ResultCache
+    result_cache = ResultCache(RESULT_CACHE_SIZE, RESULT_CACHE_TTL)
+
+# Host-wide variant shared by all serve.py workers: MATH_SHARED_CACHE_SLOTS=65536.
+# Created at import, i.e. in the master before fork; MATH_SHARED_CACHE_PATH
+# (e.g. /dev/shm/math_cache) shares it between unrelated processes instead.
+SHARED_CACHE_SLOTS = int(os.environ.get("MATH_SHARED_CACHE_SLOTS", "0"))  # 0 disables
+if SHARED_CACHE_SLOTS > 0:
+    from math_shm_cache import SharedResultCache
+    result_cache = SharedResultCache(
+        SHARED_CACHE_SLOTS,
+        slot_size=int(os.environ.get("MATH_SHARED_CACHE_SLOT_SIZE", "512")),
+        ttl=RESULT_CACHE_TTL,
+        path=os.environ.get("MATH_SHARED_CACHE_PATH") or None,
+    )
+
+# Identical concurrent GET requests share one computation (MATH_SINGLEFLIGHT=0 turns it off)
+singleflight = SingleFlight() if os.environ.get("MATH_SINGLEFLIGHT", "1") != "0" else None
+
+# Request counters and latency histograms on /metrics (MATH_METRICS=0 turns recording off)
+METRICS_ENABLED = os.environ.get("MATH_METRICS", "1") != "0"
+metrics = Metrics()
+
+# Server-Timing header with per-phase durations (parse, float, compute, json):
+#   MATH_SERVER_TIMING=1, plus MATH_TIMING_LOG_SAMPLE=0.01 to log 1% of requests as JSON lines
+SERVER_TIMING_ENABLED = os.environ.get("MATH_SERVER_TIMING", "0") == "1"
+TIMING_LOG_SAMPLE = float(os.environ.get("MATH_TIMING_LOG_SAMPLE", "0"))
+timing_log = logging.getLogger("math_api.timing")
+if TIMING_LOG_SAMPLE and not timing_log.handlers:
+    # nothing else configures logging here: without this the INFO lines are dropped
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    timing_log.addHandler(_handler)
+    timing_log.setLevel(logging.INFO)
+    timing_log.propagate = False  # not twice when the host app does configure the root logger
+
+# Admission control / load shedding, off unless MATH_MAX_INFLIGHT or MATH_RATE is set:
+#   MATH_MAX_INFLIGHT=32 MATH_MAX_QUEUE=64 MATH_QUEUE_TIMEOUT=0.5 MATH_RATE=2000 MATH_BURST=200
+admission = AdmissionController(
+    max_inflight=int(os.environ.get("MATH_MAX_INFLIGHT", "0")),
+    max_queue=int(os.environ.get("MATH_MAX_QUEUE", "64")),
+    queue_timeout=float(os.environ.get("MATH_QUEUE_TIMEOUT", "1.0")),
+    rate=float(os.environ.get("MATH_RATE", "0")),
+    burst=float(os.environ.get("MATH_BURST", "0")),
+)
+ADMISSION_ENABLED = bool(admission.max_inflight or admission.bucket)
+ADMISSION_EXEMPT = {"/metrics", "/stats"}  # keep observability reachable while shedding
+
+# Heavy ops (power, factorial) run in worker processes with a time budget per call
+def _make_heavy_pool():
+    from math_heavy import HeavyPool
+    return HeavyPool(
+        workers=int(os.environ.get("MATH_HEAVY_WORKERS", "2")),
+        timeout=float(os.environ.get("MATH_HEAVY_TIMEOUT", "2.0")),
+        queue_timeout=float(os.environ.get("MATH_HEAVY_QUEUE_TIMEOUT", "1.0")),
+    )
+
+heavy_pool = Lazy(_make_heavy_pool)
+
+# Background jobs for large batches: MATH_JOB_DIR, MATH_JOB_WORKERS, MATH_JOB_CHUNK, MATH_JOB_TTL
+JOB_PAGE_SIZE = 10_000       # default results per GET /math/jobs/<id>
+MAX_JOB_PAGE_SIZE = 100_000
+MAX_JOB_BATCH = 50_000_000
+
+_np = None
+
+def numpy_or_none():
+    # NumPy is optional: imported on first use, pure-Python fallback if missing
+    global _np
+    if _np is None:
+        try:
+            import numpy
+            _np = numpy
+        except ImportError:
+            _np = False
+    return _np or None
 
 def compute(op: str, a: float, b: float):
     op = (op or "").lower()
@@ -15,83 +150,823 @@ def compute(op: str, a: float, b: float):
         if b == 0:
             raise ValueError("Division by zero not allowed")
         return a / b
+    if op in HEAVY_OPS:
+        raise ValueError(f"'{op}' is a heavy operation; use /calc, /math/{op} or POST /math")
     raise ValueError(f"Unknown operation '{op}' (use add, subtract, multiply, divide)")
 
-@app.get("/")
+def vector_op(np, name, x, y):
+    # NumPy version of compute() for one known op: returns (result, division-by-zero mask or None)
+    if name == "add":
+        return x + y, None
+    if name == "subtract":
+        return x - y, None
+    if name == "multiply":
+        return x * y, None
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return x / y, y == 0
+
+def check_numbers(name, values):
+    # np.asarray(..., dtype=float64) turns null into NaN without complaint; reject it
+    # up front so the NumPy and pure-Python paths answer the same 400
+    if isinstance(values, list) and None in values:
+        raise ValueError(f"{name}[{values.index(None)}] is not a number")
+
+def compute_batch(op, a, b):
+    """
+    Evaluate many (op, a, b) triples at once.
+    `op` is either one op name for every element or a list with one name per element.
+    Returns (results, errors): results[i] is None where errors has {"index": i, ...}.
+    """
+    n = len(a)
+    if len(b) != n:
+        raise ValueError("a and b must have the same length")
+    if not isinstance(op, str) and len(op) != n:
+        raise ValueError("ops must have the same length as a and b")
+    if n > MAX_BATCH:
+        raise ValueError(f"Batch too large ({n} > {MAX_BATCH})")
+    check_numbers("a", a)
+    check_numbers("b", b)
+
+    np = numpy_or_none()
+    if np is None:
+        results, errors = [], []
+        for i in range(n):
+            try:
+                name = op if isinstance(op, str) else str(op[i] or "")  # as the NumPy path reads ops
+                results.append(compute(name, float(a[i]), float(b[i])))
+            except ValueError as e:
+                results.append(None)
+                errors.append({"index": i, "error": str(e)})
+        return results, errors
+
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    out = np.full(n, np.nan)
+    failed = {}
+
+    def apply(name, idx):
+        # idx is a slice (whole array) or a boolean mask
+        out[idx], bad = vector_op(np, name, a[idx], b[idx])
+        if bad is not None:
+            zero = np.zeros(n, dtype=bool)
+            zero[idx] = bad
+            for i in np.flatnonzero(zero).tolist():
+                failed[i] = "Division by zero not allowed"
+
+    if isinstance(op, str):
+        name = op.lower()
+        if name not in OPS:
+            # a bad op for the whole batch rejects the request (same message as compute)
+            compute(name, 0.0, 1.0)
+        apply(name, slice(None))
+    else:
+        names = np.asarray([str(o or "").lower() for o in op])
+        known = np.zeros(n, dtype=bool)
+        for name in OPS:
+            mask = names == name
+            if mask.any():
+                known |= mask
+                apply(name, mask)
+        for i in np.flatnonzero(~known).tolist():
+            failed[i] = f"Unknown operation '{names[i]}' (use add, subtract, multiply, divide)"
+
+    results = out.tolist()
+    for i in failed:
+        results[i] = None
+    errors = [{"index": i, "error": failed[i]} for i in sorted(failed)]
+    return results, errors
+
+# ---------- Reductions and matrices: /math/reduce, /math/matmul ----------
+
+REDUCE_OPS = ("sum", "mean", "min", "max", "dot")
+
+def reduce_values(op, a, b=None):
+    """sum/mean/min/max of a, or dot(a, b); NumPy when available."""
+    op = (op or "").lower()
+    if op not in REDUCE_OPS:
+        raise ValueError(f"Unknown reduction '{op}' (use {', '.join(REDUCE_OPS)})")
+    if len(a) > MAX_BATCH:
+        raise ValueError(f"Array too large ({len(a)} > {MAX_BATCH})")
+    if op == "dot" and (b is None or len(b) != len(a)):
+        raise ValueError("dot needs lists a and b of the same length")
+    if op in ("mean", "min", "max") and len(a) == 0:
+        raise ValueError(f"{op} needs at least one value")
+    check_numbers("a", a)
+    if b is not None:
+        check_numbers("b", b)
+
+    np = numpy_or_none()
+    if np is None:
+        a = [float(x) for x in a]
+        if op == "sum":
+            return sum(a)
+        if op == "mean":
+            return sum(a) / len(a)
+        if op == "min":
+            return min(a)
+        if op == "max":
+            return max(a)
+        return sum(x * float(y) for x, y in zip(a, b))
+
+    x = np.asarray(a, dtype=np.float64)
+    if op == "dot":
+        return float(np.dot(x, np.asarray(b, dtype=np.float64)))
+    return float(getattr(np, op)(x))
+
+def _matrix(m, name):
+    if not isinstance(m, list) or not m or not all(isinstance(row, list) for row in m):
+        raise ValueError(f"{name} must be a non-empty list of rows")
+    width = len(m[0])
+    if width == 0 or any(len(row) != width for row in m):
+        raise ValueError(f"{name} rows must all have the same, non-zero length")
+    if len(m) * width > MAX_MATRIX_CELLS:
+        raise ValueError(f"{name} too large ({len(m) * width} > {MAX_MATRIX_CELLS} elements)")
+    for i, row in enumerate(m):
+        check_numbers(f"{name}[{i}]", row)
+    return len(m), width
+
+def matmul(a, b):
+    """a (n x k) @ b (k x m); returns the rows of the product."""
+    n, k = _matrix(a, "a")
+    k2, m = _matrix(b, "b")
+    if k != k2:
+        raise ValueError(f"Shapes do not align: a is {n}x{k}, b is {k2}x{m}")
+    if n * m > MAX_MATRIX_CELLS:
+        raise ValueError(f"Result too large ({n * m} > {MAX_MATRIX_CELLS} elements)")
+    np = numpy_or_none()
+    if np is None:
+        cols = list(zip(*[[float(v) for v in row] for row in b]))
+        return [[sum(float(x) * y for x, y in zip(row, col)) for col in cols] for row in a]
+    return np.asarray(a, dtype=np.float64) @ np.asarray(b, dtype=np.float64)
+
+# ---------- Expressions: /math/expr ----------
+
+_EXPR_OPS = {ast.Add: "add", ast.Sub: "subtract", ast.Mult: "multiply", ast.Div: "divide"}
+
+def _compile_node(node, names):
+    # Turns a whitelisted AST into nested closures fn(env, binop); nothing is eval'd
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        value = float(node.value)
+        return lambda env, binop: value
+    if isinstance(node, ast.Name):
+        name = node.id
+        names.append(name)
+        return lambda env, binop: env[name]
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.UAdd, ast.USub)):
+        inner = _compile_node(node.operand, names)
+        if isinstance(node.op, ast.USub):
+            return lambda env, binop: -inner(env, binop)
+        return inner
+    if isinstance(node, ast.BinOp) and type(node.op) in _EXPR_OPS:
+        op = _EXPR_OPS[type(node.op)]
+        left = _compile_node(node.left, names)
+        right = _compile_node(node.right, names)
+        return lambda env, binop: binop(op, left(env, binop), right(env, binop))
+    kind = type(getattr(node, "op", node)).__name__
+    raise ValueError(f"Unsupported expression element '{kind}' (use numbers, names, + - * / and parentheses)")
+
+@lru_cache(maxsize=EXPR_CACHE_SIZE)
+def compile_expr(text: str):
+    """
+    Parse and compile a formula like "(a+b)*c/d" once.
+    Returns (fn, names); cached by expression text, so hot formulas skip parsing.
+    """
+    if len(text) > MAX_EXPR_LEN:
+        raise ValueError(f"Expression too long ({len(text)} > {MAX_EXPR_LEN} characters)")
+    try:
+        tree = ast.parse(text, mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Invalid expression: {e.msg}")
+    names = []
+    try:
+        fn = _compile_node(tree.body, names)
+    except RecursionError:
+        raise ValueError("Expression is nested too deeply")
+    return fn, tuple(dict.fromkeys(names))
+
+def evaluate_expr(text, bindings):
+    """
+    Evaluate one compiled formula for many variable bindings.
+    Returns (results, errors) in the same shape as compute_batch().
+    """
+    fn, names = compile_expr(text.strip())
+    n = len(bindings)
+    if n > MAX_BATCH:
+        raise ValueError(f"Batch too large ({n} > {MAX_BATCH})")
+    for i, env in enumerate(bindings):
+        if not isinstance(env, dict):
+            raise ValueError(f"Binding {i} must be an object")
+        for name in names:
+            if name not in env:
+                raise ValueError(f"Binding {i} is missing variable '{name}'")
+            value = env[name]
+            if type(value) not in (int, float):
+                # null would become NaN in the NumPy columns; reject it on both paths
+                try:
+                    float(value)
+                except (TypeError, ValueError):
+                    raise ValueError(f"Binding {i} variable '{name}' is not a number")
+
+    np = numpy_or_none()
+    if np is None or n == 0:
+        results, errors = [], []
+        for i, env in enumerate(bindings):
+            try:
+                results.append(float(fn({k: float(env[k]) for k in names}, compute)))
+            except ValueError as e:
+                results.append(None)
+                errors.append({"index": i, "error": str(e)})
+        return results, errors
+
+    columns = {k: np.asarray([env[k] for env in bindings], dtype=np.float64) for k in names}
+    zero = np.zeros(n, dtype=bool)
+
+    def binop(op, x, y):
+        if op == "add":
+            return x + y
+        if op == "subtract":
+            return x - y
+        if op == "multiply":
+            return x * y
+        nonlocal zero
+        zero = zero | (np.asarray(y) == 0)  # a constant zero divisor fails every binding
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.divide(x, y)  # also for two constants, where / would raise
+
+    out = np.broadcast_to(np.asarray(fn(columns, binop), dtype=np.float64), (n,))
+    results = out.tolist()
+    errors = []
+    for i in np.flatnonzero(zero).tolist():
+        results[i] = None
+        errors.append({"index": i, "error": "Division by zero not allowed"})
+    return results, errors
+
+HOME_DOC = {
+    "ok": True,
+    "try": [
+        "/calc?op=add&a=5&b=10",
+        "/math?op=add&a=5&b=10",
+        "/math/add?a=5&b=10",
+        "/math/add/5/10",
+        "/math/power/2/100",
+        "/math/factorial/25/0"
+    ],
+    "post_json_example": {"op": "add", "a": 5, "b": 10},
+    "post_batch_example": {"op": "add", "a": [1, 2, 3], "b": [4, 5, 6]},
+    "post_stream_example": '{"op": "add", "a": 5, "b": 10}\n{"op": "divide", "a": 1, "b": 0}\n',
+    "post_expr_example": {"expr": "(a+b)*c/d", "bindings": [{"a": 1, "b": 2, "c": 3, "d": 4}]},
+    "post_reduce_example": {"op": "sum", "a": [1, 2, 3]},
+    "post_matmul_example": {"a": [[1, 2], [3, 4]], "b": [[5], [6]]}
+}
+
+# Conditional GET: the discovery document and path-style results never change for
+# a given URL, so they carry a strong ETag (If-None-Match -> 304) and a public
+# Cache-Control max-age that lets CDNs and clients answer them without us:
+#   MATH_HOME_MAX_AGE=300 MATH_PATH_MAX_AGE=86400 (seconds, 0 = must revalidate)
+HOME_MAX_AGE = int(os.environ.get("MATH_HOME_MAX_AGE", "300"))
+PATH_MAX_AGE = int(os.environ.get("MATH_PATH_MAX_AGE", "86400"))
+
+def body_etag(body):
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+# the discovery document is serialized and hashed once, not per request
+HOME_BODY = json.dumps(HOME_DOC, sort_keys=True, separators=(",", ":")).encode() + b"\n"
+HOME_ETAG = body_etag(HOME_BODY)
+
+def cacheable(resp, max_age, etag=None):
+    resp.set_etag(etag or body_etag(resp.get_data()))
+    resp.cache_control.public = True
+    resp.cache_control.max_age = max_age
+    return resp.make_conditional(request)
+
 def home():
+    return cacheable(Response(HOME_BODY, mimetype="application/json"), HOME_MAX_AGE, HOME_ETAG)
+
+def compute_response(op, a, b):
+    # float() + compute() + jsonify for the GET routes. With the result cache
+    # enabled, repeat (op, a, b) tuples are answered from stored response bodies;
+    # identical requests arriving together are computed once (single-flight).
+    try:
+        with phase("float"):
+            key = (op, float(a), float(b))
+    except (TypeError, ValueError):
+        key = None
+    if key is None:
+        payload, status = evaluate_json({"op": op, "a": a, "b": b})
+        with phase("json"):
+            return jsonify(payload), status
+
+    if result_cache is not None:
+        hit = result_cache.get(key)
+        if hit is not None:
+            body, status = hit
+            return Response(body, status, mimetype="application/json")
+
+    def render():
+        payload, status = evaluate_json({"op": op, "a": a, "b": b})
+        with phase("json"):
+            return jsonify(payload).get_data(), status
+
+    if singleflight is not None:
+        (body, status), shared = singleflight.do(key, render)
+    else:
+        (body, status), shared = render(), False
+    if result_cache is not None and not shared and status in (200, 400, 422):
+        result_cache.put(key, (body, status))  # only answers that depend on the input alone
+    return Response(body, status, mimetype="application/json")
+
+# ---------- Metrics ----------
+
+@bp.before_app_request
+def _metrics_start():
+    if METRICS_ENABLED:
+        g.metrics_t0 = time.perf_counter()
+
+@bp.after_app_request
+def _metrics_record(resp):
+    t0 = g.pop("metrics_t0", None)
+    if t0 is not None:
+        rule = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        op = (request.view_args or {}).get("op") or request.args.get("op")
+        if op is None and rule == "/math" and request.method == "POST" and request.is_json:
+            data = request.get_json(silent=True)
+            if isinstance(data, dict):  # lists/strings are answered 400 by evaluate_json
+                op = data.get("op")
+        if op is not None:
+            # keep label cardinality bounded: arbitrary client strings all count as "other"
+            op = op.lower() if isinstance(op, str) and op.lower() in OPS + HEAVY_OPS else "other"
+        metrics.observe(rule, request.method, resp.status_code, time.perf_counter() - t0, op)
+    return resp
+
+# Uploaded operand arrays (memory-mapped files): MATH_DATASET_DIR, MATH_DATASET_MAX_BYTES.
+# Datasets and jobs touch disk and start threads, so they are built on first use.
+def _make_datasets():
+    from math_datasets import DatasetStore
+    return DatasetStore(
+        directory=os.environ.get("MATH_DATASET_DIR"),
+        max_bytes=int(os.environ.get("MATH_DATASET_MAX_BYTES", str(1 << 30))),
+        numpy_or_none=numpy_or_none,
+    )
+
+def _make_jobs():
+    from math_jobs import JobManager
+    return JobManager(
+        compute_batch,
+        directory=os.environ.get("MATH_JOB_DIR"),
+        workers=int(os.environ.get("MATH_JOB_WORKERS", "2")),
+        chunk_size=int(os.environ.get("MATH_JOB_CHUNK", "100000")),
+        ttl=float(os.environ.get("MATH_JOB_TTL", "3600")),
+    )
+
+datasets = Lazy(_make_datasets)
+jobs = Lazy(_make_jobs)
+
+metrics.add_collector("admission_inflight", "gauge", "Requests currently executing.",
+                      lambda: [({}, admission.inflight)])
+metrics.add_collector("admission_queue_depth", "gauge", "Requests waiting for an execution slot.",
+                      lambda: [({}, admission.waiting)])
+metrics.add_collector("admission_shed_total", "counter", "Requests rejected by admission control.",
+                      lambda: [({"reason": r}, n) for r, n in sorted(admission.shed.items())])
+metrics.add_collector("singleflight_coalesced_total", "counter",
+                      "Requests answered with another in-flight request's result.",
+                      lambda: [({}, singleflight.coalesced if singleflight is not None else 0)])
+
+# ---------- Admission control ----------
+
+@bp.before_app_request
+def _admit():
+    if not ADMISSION_ENABLED or request.path in ADMISSION_EXEMPT:
+        return None
+    status, retry_after = admission.acquire()
+    if status is not None:
+        msg = "Rate limit exceeded" if status == 429 else "Server busy, retry later"
+        return jsonify({"error": msg}), status, {"Retry-After": str(retry_after)}
+    g.admitted = True
+    return None
+
+@bp.teardown_app_request
+def _release(exc):
+    if g.pop("admitted", False):
+        admission.release()
+
+# ---------- Server-Timing ----------
+
+@bp.before_app_request
+def _timing_start():
+    if SERVER_TIMING_ENABLED:
+        g.timing = (math_timing.start(), time.perf_counter_ns())
+
+@bp.after_app_request
+def _timing_finish(resp):
+    started = g.pop("timing", None)
+    if started is not None:
+        token, t0 = started
+        timings = math_timing.stop(token)
+        total = time.perf_counter_ns() - t0
+        resp.headers["Server-Timing"] = server_timing_header(timings, total)
+        if METRICS_ENABLED:
+            for name, ns in timings.items():
+                metrics.observe_phase(name, ns / 1e9)
+        if TIMING_LOG_SAMPLE and random.random() < TIMING_LOG_SAMPLE:
+            timing_log.info(json.dumps({
+                "route": request.url_rule.rule if request.url_rule is not None else "unmatched",
+                "method": request.method,
+                "status": resp.status_code,
+                "total_ms": round(total / 1e6, 3),
+                "phases_ms": {name: round(ns / 1e6, 3) for name, ns in timings.items()},
+            }))
+    return resp
+
+@bp.get("/metrics")
+def metrics_endpoint():
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+@bp.get("/stats")
+def stats():
     return jsonify({
-        "ok": True,
-        "try": [
-            "/calc?op=add&a=5&b=10",
-            "/math?op=add&a=5&b=10",
-            "/math/add?a=5&b=10",
-            "/math/add/5/10"
-        ],
-        "post_json_example": {"op": "add", "a": 5, "b": 10}
+        "result_cache": result_cache.stats() if result_cache is not None else None,
+        "expr_cache": compile_expr.cache_info()._asdict(),
+        "admission": admission.stats() if ADMISSION_ENABLED else None,
+        # subsystems nobody has used yet are reported as null rather than built here
+        "jobs": jobs.stats() if jobs.built else None,
+        "datasets": datasets.stats() if datasets.built else None,
+        "heavy_pool": heavy_pool.stats() if heavy_pool.built else None,
+        "singleflight": singleflight.stats() if singleflight is not None else None,
     })
 
 # Main endpoint (query params)
-@app.get("/calc")
-@app.get("/math")  # alias so /math works
+@bp.get("/calc")
+@bp.get("/math")  # alias so /math works
 def calc_query():
-    op = request.args.get("op", "")
-    a = request.args.get("a", None)
-    b = request.args.get("b", None)
+    with phase("parse"):
+        op = request.args.get("op", "")
+        a = request.args.get("a", None)
+        b = request.args.get("b", None)
     if a is None or b is None or not op:
         return jsonify({"error": "Provide op, a, b (e.g., /calc?op=add&a=5&b=10)"}), 400
-    try:
-        a = float(a); b = float(b)
-        result = compute(op, a, b)
-        return jsonify({"operation": op, "a": a, "b": b, "result": result})
-    except ValueError as e:
-        return jsonify({"error": str(e)}), 400
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+    return compute_response(op, a, b)
 
 # Path op + query numbers: /math/add?a=5&b=10
-@app.get("/math/<op>")
+@bp.get("/math/<op>")
 def calc_path_query(op):
-    a = request.args.get("a", None)
-    b = request.args.get("b", None)
+    with phase("parse"):
+        a = request.args.get("a", None)
+        b = request.args.get("b", None)
     if a is None or b is None:
         return jsonify({"error": "Provide a and b (e.g., /math/add?a=5&b=10)"}), 400
+    return compute_response(op, a, b)
+
+# Pure path style: /math/add/5/10
+@bp.get("/math/<op>/<a>/<b>")
+def calc_path_all(op, a, b):
+    resp = compute_response(op, a, b)
+    if isinstance(resp, Response) and resp.status_code == 200:
+        return cacheable(resp, PATH_MAX_AGE)  # a pure function of the URL
+    return resp
+
+def json_object():
+    # request JSON if it is an object, else {} (a list or string body then fails
+    # the route's field checks with 400 instead of an AttributeError)
+    data = request.get_json(silent=True)
+    return data if isinstance(data, dict) else {}
+
+# JSON body: POST /math  { "op": "add", "a": 5, "b": 10 }
+def evaluate_json(data):
+    # Shared by every single-op route; returns (payload, status)
+    if not isinstance(data, dict):
+        data = {}
+    op = data.get("op"); a = data.get("a"); b = data.get("b")
+    if op is None or a is None or b is None:
+        return {"error": "JSON must include op, a, b"}, 400
+    if isinstance(op, str) and op.lower() in HEAVY_OPS:
+        return evaluate_heavy(op, a, b)
+    try:
+        with phase("float"):
+            a = float(a); b = float(b)
+        with phase("compute"):
+            result = compute(op, a, b)
+        return {"operation": op, "a": a, "b": b, "result": result}, 200
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    except Exception as e:
+        return {"error": str(e)}, 500
+
+def evaluate_heavy(op, a, b):
+    # power/factorial run in the process pool: 422 bad input, 408 over budget, 503 pool busy
     try:
-        a = float(a); b = float(b)
-        result = compute(op, a, b)
-        return jsonify({"operation": op, "a": a, "b": b, "result": result})
+        with phase("float"):
+            a = float(a); b = float(b)
     except ValueError as e:
+        return {"error": str(e)}, 400
+    except Exception as e:
+        return {"error": str(e)}, 500
+    try:
+        with phase("compute"):
+            result = heavy_pool.run(op.lower(), (a, b))
+        return {"operation": op, "a": a, "b": b, "result": result}, 200
+    except HeavyTimeout as e:
+        return {"error": str(e)}, 408
+    except HeavyBusy as e:
+        return {"error": str(e)}, 503
+    except ValueError as e:
+        return {"error": str(e)}, 422
+    except Exception as e:
+        return {"error": str(e)}, 500
+
+@bp.post("/math")
+def calc_post_json():
+    with phase("parse"):
+        data = request.get_json(silent=True) or {}
+    payload, status = evaluate_json(data)
+    with phase("json"):
+        return jsonify(payload), status
+
+# NDJSON stream: POST /math/stream, one {"op","a","b"} object per line.
+# The body is read line by line and each result is written as soon as it is
+# computed, so memory use does not grow with the upload size.
+@bp.post("/math/stream")
+def calc_stream():
+    def generate():
+        for n, raw in enumerate(request.stream, start=1):
+            raw = raw.strip()
+            if not raw:
+                continue
+            try:
+                data = json.loads(raw)
+            except ValueError:
+                payload, status = {"error": "Invalid JSON"}, 400
+            else:
+                payload, status = evaluate_json(data)
+            payload["line"] = n
+            payload["status"] = status
+            yield json.dumps(payload) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+# Batch: POST /math/batch
+#   { "op": "add", "a": [1, 2], "b": [3, 4] }           one op for every element
+#   { "ops": ["add", "divide"], "a": [1, 2], "b": [3, 0] } one op per element
+@bp.post("/math/batch")
+def calc_batch():
+    if request.mimetype == "application/octet-stream":
+        return calc_batch_packed()
+    data = json_object()
+    op = data.get("ops", data.get("op"))
+    try:
+        a = resolve_operand(data.get("a")); b = resolve_operand(data.get("b"))
+    except LookupError as e:
+        return jsonify({"error": str(e.args[0])}), 404
+    if op is None or not is_array(a) or not is_array(b):
+        return jsonify({"error": "JSON must include op (or ops) and lists (or datasets) a, b"}), 400
+    if not isinstance(op, (str, list)):
+        return jsonify({"error": "op must be a string, ops a list of strings"}), 400
+    try:
+        results, errors = compute_batch(op, a, b)
+        return jsonify({
+            "operation": op if isinstance(op, str) else "mixed",
+            "count": len(results),
+            "results": results,
+            "errors": errors,
+        })
+    except (ValueError, TypeError) as e:
         return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-# Pure path style: /math/add/5/10
-@app.get("/math/<op>/<a>/<b>")
-def calc_path_all(op, a, b):
+# Binary batch: POST /math/batch with Content-Type: application/octet-stream
+#   request:  header (8-byte ASCII op, NUL padded + uint64 count n), then a and b
+#             as n little-endian float64 each
+#   response: same header, n little-endian float64 results, then n uint8 flags
+#             (0 = ok, 1 = division by zero; the result slot holds NaN/inf)
+# NumPy reads a and b straight out of the request buffer with frombuffer, so no
+# per-element Python floats are created.
+PACKED_HEADER = struct.Struct("<8sQ")
+
+def calc_batch_packed():
+    data = request.get_data(cache=False)
+    if len(data) < PACKED_HEADER.size:
+        return jsonify({"error": "Binary batch needs a 16-byte header (op, count)"}), 400
+    raw_op, n = PACKED_HEADER.unpack_from(data)
+    op = raw_op.rstrip(b"\0").decode("ascii", "replace").lower()
+    if n > MAX_PACKED_BATCH:
+        return jsonify({"error": f"Batch too large ({n} > {MAX_PACKED_BATCH})"}), 400
+    if len(data) != PACKED_HEADER.size + 16 * n:
+        return jsonify({"error": f"Expected {16 * n} bytes of float64 data for count {n}"}), 400
+    if op not in OPS:
+        return jsonify({"error": f"Unknown operation '{op}' (use add, subtract, multiply, divide)"}), 400
+
+    np = numpy_or_none()
+    header = PACKED_HEADER.pack(op.encode("ascii"), n)
+    if np is not None:
+        view = memoryview(data)
+        a = np.frombuffer(view, dtype="<f8", count=n, offset=PACKED_HEADER.size)
+        b = np.frombuffer(view, dtype="<f8", count=n, offset=PACKED_HEADER.size + 8 * n)
+        out, bad = vector_op(np, op, a, b)
+        flags = bad.astype(np.uint8) if bad is not None else np.zeros(n, dtype=np.uint8)
+        body = header + out.astype("<f8", copy=False).tobytes() + flags.tobytes()
+    else:
+        if n > MAX_BATCH:
+            # the pure-Python loop is held to the JSON batch limit, not MAX_PACKED_BATCH
+            return jsonify({"error": f"Batch too large ({n} > {MAX_BATCH}) without NumPy"}), 400
+        a = array("d"); a.frombytes(data[PACKED_HEADER.size:PACKED_HEADER.size + 8 * n])
+        b = array("d"); b.frombytes(data[PACKED_HEADER.size + 8 * n:])
+        if sys.byteorder == "big":
+            a.byteswap(); b.byteswap()
+        results, errors = compute_batch(op, a, b)
+        flags = bytearray(n)
+        for e in errors:
+            flags[e["index"]] = 1
+        out = array("d", (float("nan") if r is None else r for r in results))
+        if sys.byteorder == "big":
+            out.byteswap()
+        body = header + out.tobytes() + bytes(flags)
+    return Response(body, mimetype="application/octet-stream")
+
+# Reduction: POST /math/reduce  { "op": "sum", "a": [1, 2, 3] }  or  { "op": "dot", "a": [...], "b": [...] }
+@bp.post("/math/reduce")
+def calc_reduce():
+    data = json_object()
+    op = data.get("op")
     try:
-        a = float(a); b = float(b)
-        result = compute(op, a, b)
-        return jsonify({"operation": op, "a": a, "b": b, "result": result})
-    except ValueError as e:
+        a = resolve_operand(data.get("a")); b = resolve_operand(data.get("b"))
+    except LookupError as e:
+        return jsonify({"error": str(e.args[0])}), 404
+    if not isinstance(op, str) or not is_array(a) or (b is not None and not is_array(b)):
+        return jsonify({"error": "JSON must include op and list (or dataset) a, and b for dot"}), 400
+    try:
+        result = reduce_values(op, a, b)
+        return jsonify({"operation": op, "count": len(a), "result": result})
+    except (ValueError, TypeError) as e:
         return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-# JSON body: POST /math  { "op": "add", "a": 5, "b": 10 }
-@app.post("/math")
-def calc_post_json():
-    data = request.get_json(silent=True) or {}
-    op = data.get("op"); a = data.get("a"); b = data.get("b")
-    if op is None or a is None or b is None:
-        return jsonify({"error": "JSON must include op, a, b"}), 400
+# Matrix multiply: POST /math/matmul  { "a": [[1, 2], [3, 4]], "b": [[5], [6]] }
+# Results above MATMUL_STREAM_CELLS elements are streamed one row at a time.
+@bp.post("/math/matmul")
+def calc_matmul():
+    data = json_object()
     try:
-        a = float(a); b = float(b)
-        result = compute(op, a, b)
-        return jsonify({"operation": op, "a": a, "b": b, "result": result})
-    except ValueError as e:
+        out = matmul(data.get("a"), data.get("b"))
+    except (ValueError, TypeError) as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    rows, cols = len(out), len(out[0])
+    tolist = (lambda row: row.tolist()) if hasattr(out, "tolist") else (lambda row: row)
+    if rows * cols <= MATMUL_STREAM_CELLS:
+        return jsonify({"operation": "matmul", "shape": [rows, cols], "result": [tolist(r) for r in out]})
+
+    def generate():
+        yield f'{{"operation": "matmul", "shape": [{rows}, {cols}], "result": ['
+        for i, row in enumerate(out):
+            yield ("," if i else "") + json.dumps(tolist(row))
+        yield "]}\n"
+
+    return Response(generate(), mimetype="application/json")
+
+# Expression: POST /math/expr
+#   { "expr": "(a+b)*c/d", "vars": {"a": 1, "b": 2, "c": 3, "d": 4} }        one result
+#   { "expr": "(a+b)*c/d", "bindings": [{"a": 1, ...}, {"a": 5, ...}] }     batch
+@bp.post("/math/expr")
+def calc_expr():
+    data = json_object()
+    text = data.get("expr")
+    if not isinstance(text, str) or not text.strip():
+        return jsonify({"error": "JSON must include expr and vars (or bindings)"}), 400
+    single = "bindings" not in data
+    bindings = [data.get("vars") or {}] if single else data.get("bindings")
+    if not isinstance(bindings, list):
+        return jsonify({"error": "bindings must be a list of objects"}), 400
+    try:
+        results, errors = evaluate_expr(text, bindings)
+        if single:
+            if errors:
+                return jsonify({"error": errors[0]["error"]}), 400
+            return jsonify({"expr": text, "vars": bindings[0], "result": results[0]})
+        return jsonify({"expr": text, "count": len(results), "results": results, "errors": errors})
+    except (ValueError, TypeError) as e:
         return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+# ---------- Datasets ----------
+# Upload once, then use {"dataset": "<name>"} in place of a literal a/b list in
+# /math/batch, /math/reduce and /math/jobs.
+#   POST   /math/datasets               {"name": "v1", "values": [...]}   (name optional)
+#   POST   /math/datasets?name=v1       raw little-endian float64, Content-Type: application/octet-stream
+#   GET    /math/datasets               list
+#   DELETE /math/datasets/<name>
+
+def resolve_operand(value):
+    # {"dataset": "name"} -> memory-mapped stored array; anything else unchanged
+    if isinstance(value, dict) and "dataset" in value:
+        arr = datasets.get(str(value["dataset"]))
+        if arr is None:
+            raise LookupError(f"Unknown dataset '{value['dataset']}'")
+        return arr
+    return value
+
+def is_array(value):
+    return isinstance(value, (list, memoryview, array)) or hasattr(value, "dtype")
+
+@bp.post("/math/datasets")
+def dataset_upload():
+    try:
+        if request.mimetype == "application/octet-stream":
+            info = datasets.put(request.args.get("name"), request.get_data(cache=False))
+        else:
+            data = json_object()
+            values = data.get("values")
+            if not isinstance(values, list):
+                return jsonify({"error": "JSON must include a list of values"}), 400
+            info = datasets.put_values(data.get("name"), values)
+    except (ValueError, TypeError) as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    return jsonify(info), 201
+
+@bp.get("/math/datasets")
+def dataset_list():
+    return jsonify({"datasets": datasets.list(), **datasets.stats()})
+
+@bp.delete("/math/datasets/<name>")
+def dataset_delete(name):
+    if not datasets.delete(name):
+        return jsonify({"error": f"Unknown dataset '{name}'"}), 404
+    return jsonify({"deleted": name})
+
+# Jobs: POST /math/jobs (same JSON as /math/batch) -> 202 {"id": ...}
+#       GET /math/jobs/<id>?offset=0&limit=10000 -> status + a slice of results
+#       DELETE /math/jobs/<id>
+@bp.post("/math/jobs")
+def job_submit():
+    data = json_object()
+    op = data.get("ops", data.get("op"))
+    try:
+        a = resolve_operand(data.get("a")); b = resolve_operand(data.get("b"))
+    except LookupError as e:
+        return jsonify({"error": str(e.args[0])}), 404
+    if op is None or not is_array(a) or not is_array(b):
+        return jsonify({"error": "JSON must include op (or ops) and lists (or datasets) a, b"}), 400
+    if not isinstance(op, (str, list)):
+        return jsonify({"error": "op must be a string, ops a list of strings"}), 400
+    if isinstance(op, str) and op.lower() not in OPS:
+        return jsonify({"error": f"Unknown operation '{op}' (use add, subtract, multiply, divide)"}), 400
+    if len(a) > MAX_JOB_BATCH:
+        return jsonify({"error": f"Batch too large ({len(a)} > {MAX_JOB_BATCH})"}), 400
+    try:
+        job = jobs.submit(op, a, b)
+    except (ValueError, TypeError) as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    return jsonify(job.info()), 202, {"Location": f"/math/jobs/{job.id}"}
+
+@bp.get("/math/jobs/<job_id>")
+def job_status(job_id):
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": f"Unknown job '{job_id}'"}), 404
+    try:
+        offset = max(0, int(request.args.get("offset", 0)))
+        limit = min(MAX_JOB_PAGE_SIZE, max(1, int(request.args.get("limit", JOB_PAGE_SIZE))))
+    except ValueError:
+        return jsonify({"error": "offset and limit must be integers"}), 400
+    results, errors = jobs.read(job, offset, limit)
+    body = job.info()
+    body.update({"offset": offset, "results": results, "errors": errors})
+    next_offset = offset + len(results)
+    body["next_offset"] = next_offset if next_offset < job.total else None
+    return jsonify(body)
+
+@bp.delete("/math/jobs/<job_id>")
+def job_delete(job_id):
+    job = jobs.delete(job_id)
+    if job is None:
+        return jsonify({"error": f"Unknown job '{job_id}'"}), 404
+    return jsonify({"deleted": job_id})
+
+def create_app():
+    """Standalone math API: the blueprint plus the discovery document on /."""
+    standalone = Flask(__name__)
+    standalone.register_blueprint(bp)
+    standalone.add_url_rule("/", "home", home)
+    return standalone
+
+_app = None
+
+def __getattr__(name):
+    # `from playwright_key_function import app` builds the standalone app on first use,
+    # so importing the module for its blueprint (or for the ASGI build) skips it
+    global _app
+    if name == "app":
+        if _app is None:
+            _app = create_app()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 if __name__ == "__main__":
     # Run: python math_api.py
-    app.run(host="127.0.0.1", port=5000, debug=True)
+    create_app().run(host="127.0.0.1", port=5000, debug=True)
@@ -0,0 +1,269 @@
+# serve.py
+# Production entry point for the Flask services (instead of app.run(debug=True)).
+#
+# The master process imports the app once (preload), opens the listening socket
+# and forks N workers that inherit both, so the imported code is shared
+# copy-on-write. Each worker serves requests from a fixed-size thread pool.
+#
+#   SIGHUP            graceful restart: start fresh workers, let old ones drain
+#   SIGTERM / SIGINT  graceful shutdown (workers finish in-flight requests)
+#   --max-requests N  a worker exits after ~N requests and is replaced (right
+#                     away: it tells the master, then finishes its work)
+#
+# Run: python serve.py math --port 8000 --workers 4 --threads 8 --max-requests 10000
+#      python serve.py hello --port 8001
+#      python serve.py all --port 8000     (hello + math in one app, Flask_structure.create_app)
+# (Windows has no fork: falls back to one process with --threads threads.)
+import argparse
+import gc
+import os
+import random
+import signal
+import socket
+import struct
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+def load_app(name):
+    if name == "hello":
+        from Flask_structure import app
+        return app
+    if name == "all":
+        from Flask_structure import create_app
+        return create_app()
+    if name == "math":
+        sys.path.insert(0, os.path.join(HERE, "demo_playwright"))
+        from playwright_key_function import app
+        return app
+    raise SystemExit(f"Unknown app '{name}' (use hello, math, all)")
+
+def log(msg):
+    print(f"[{os.getpid()}] {msg}", flush=True)
+
+def release_app(timeout):
+    # os._exit skips atexit, so stop what the app started in this worker: let
+    # the math API's background jobs finish (up to `timeout` seconds, after which
+    # they are reported failed) and stop its heavy-op processes, which would
+    # otherwise outlive the worker
+    math_api = sys.modules.get("playwright_key_function")
+    if math_api is None:
+        return
+    if math_api.jobs.built and not math_api.jobs.drain(timeout):
+        log("background jobs still running at exit")
+    if math_api.heavy_pool.built:
+        math_api.heavy_pool.shutdown()
+
+# ---------- Worker ----------
+
+class KeepAliveHandler(WSGIRequestHandler):
+    protocol_version = "HTTP/1.1"
+    timeout = 5  # seconds an idle keep-alive connection may hold a pool thread
+
+class PooledWSGIServer(BaseWSGIServer):
+    """werkzeug server that hands connections to a fixed thread pool instead of one thread each."""
+
+    multithread = True
+
+    def __init__(self, host, port, app, threads, fd):
+        self._slots = threading.BoundedSemaphore(threads)
+        self._pool = ThreadPoolExecutor(threads, thread_name_prefix="worker")
+        super().__init__(host, port, app, handler=KeepAliveHandler, fd=fd)
+
+    def process_request(self, request, client_address):
+        # blocks accept() while every thread is busy, so idle workers take the next connection
+        self._slots.acquire()
+        self._pool.submit(self._handle, request, client_address)
+
+    def _handle(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self._slots.release()
+
+    def drain(self):
+        # werkzeug calls server_close() while adopting the fd, so draining is a separate step
+        self._pool.shutdown(wait=True)
+
+def run_worker(app, sock, threads, max_requests, recycled_fd=None):
+    served = 0
+    lock = threading.Lock()
+    server = None
+
+    def stop(*_):
+        # shutdown() waits for serve_forever() to return, so it cannot run in this thread
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    def counting_app(environ, start_response):
+        nonlocal served
+        with lock:
+            served += 1
+            if max_requests and served == max_requests:
+                log(f"served {served} requests, recycling")
+                if recycled_fd is not None:
+                    os.write(recycled_fd, struct.pack("=i", os.getpid()))  # master starts a replacement now
+                stop()
+        return app(environ, start_response)
+
+    host, port = sock.getsockname()[:2]
+    server = PooledWSGIServer(host, port, counting_app, threads, fd=sock.fileno())
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # the master decides when to stop
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    try:
+        server.serve_forever()
+    finally:
+        server.drain()  # let in-flight requests finish
+        server.server_close()
+
+# ---------- Master ----------
+
+class Master:
+    def __init__(self, app, sock, workers, threads, max_requests, jitter, graceful_timeout):
+        self.app = app
+        self.sock = sock
+        self.size = workers
+        self.threads = threads
+        self.max_requests = max_requests
+        self.jitter = jitter
+        self.graceful_timeout = graceful_timeout
+        self.workers = {}   # pid -> start time
+        self.retiring = {}  # pid -> kill deadline
+        self.signals = []
+        self.backoff_until = 0.0
+        # workers that stop on --max-requests write their pid here
+        self.recycled_r, self.recycled_w = os.pipe()
+        os.set_blocking(self.recycled_r, False)
+
+    def spawn(self):
+        limit = self.max_requests + random.randint(0, self.jitter) if self.max_requests else 0
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                random.seed()
+                run_worker(self.app, self.sock, self.threads, limit, self.recycled_w)
+            except Exception as e:
+                log(f"worker crashed: {e}")
+                code = 1
+            finally:
+                try:
+                    release_app(self.graceful_timeout)
+                finally:
+                    os._exit(code)
+        self.workers[pid] = time.monotonic()
+
+    def retire(self, pids):
+        deadline = time.monotonic() + self.graceful_timeout
+        for pid in pids:
+            self.workers.pop(pid, None)
+            self.retiring[pid] = deadline
+            kill_quietly(pid, signal.SIGTERM)
+
+    def collect_recycled(self):
+        # a recycling worker may still be draining requests and jobs: count it as
+        # retiring so its replacement starts without waiting for it to exit
+        try:
+            data = os.read(self.recycled_r, 4096)
+        except BlockingIOError:
+            return
+        for (pid,) in struct.iter_unpack("=i", data):
+            if self.workers.pop(pid, None) is not None:
+                self.retiring[pid] = time.monotonic() + self.graceful_timeout
+
+    def reap(self):
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            started = self.workers.pop(pid, None)
+            self.retiring.pop(pid, None)
+            if started is not None and status != 0 and time.monotonic() - started < 1.0:
+                # crashed right after start: do not fork in a tight loop
+                self.backoff_until = time.monotonic() + 1.0
+
+    def run(self):
+        for sig in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT):
+            signal.signal(sig, lambda signum, frame: self.signals.append(signum))
+        # objects imported so far never change refcount pages again -> fewer COW copies
+        gc.freeze()
+        log(f"master: {self.size} workers x {self.threads} threads on "
+            f"http://{self.sock.getsockname()[0]}:{self.sock.getsockname()[1]}")
+        stopping = False
+        while True:
+            self.reap()
+            self.collect_recycled()
+            while self.signals:
+                sig = self.signals.pop(0)
+                if sig == signal.SIGHUP:
+                    log("graceful restart")
+                    old = list(self.workers)
+                    for _ in range(self.size):
+                        self.spawn()
+                    self.retire(old)
+                else:
+                    log("shutting down")
+                    stopping = True
+                    self.retire(list(self.workers))
+            if stopping:
+                if not self.retiring:
+                    return
+            elif time.monotonic() >= self.backoff_until:
+                while len(self.workers) < self.size:
+                    self.spawn()
+            now = time.monotonic()
+            for pid, deadline in list(self.retiring.items()):
+                if now > deadline:
+                    kill_quietly(pid, signal.SIGKILL)
+            time.sleep(0.1)
+
+def kill_quietly(pid, sig):
+    try:
+        os.kill(pid, sig)
+    except ProcessLookupError:
+        pass
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-forking production server for the Flask apps")
+    parser.add_argument("app", choices=["hello", "math", "all"])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes (default: CPU count)")
+    parser.add_argument("--threads", type=int, default=4, help="Threads per worker")
+    parser.add_argument("--max-requests", type=int, default=0, help="Recycle a worker after this many requests (0 = never)")
+    parser.add_argument("--max-requests-jitter", type=int, default=0, help="Random extra requests so workers do not recycle together")
+    parser.add_argument("--graceful-timeout", type=float, default=30.0, help="Seconds a stopping worker may drain before SIGKILL")
+    parser.add_argument("--backlog", type=int, default=2048)
+    args = parser.parse_args()
+
+    app = load_app(args.app)  # preload before forking
+
+    if not hasattr(os, "fork"):
+        from werkzeug.serving import run_simple
+        run_simple(args.host, args.port, app, threaded=args.threads > 1)
+        return 0
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((args.host, args.port))
+    sock.listen(args.backlog)
+    sock.set_inheritable(True)
+
+    Master(app, sock, max(1, args.workers), max(1, args.threads),
+           args.max_requests, args.max_requests_jitter, args.graceful_timeout).run()
+    sock.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main() or 0)